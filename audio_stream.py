@@ -0,0 +1,82 @@
+# audio_stream.py
+import time
+import threading
+import logging
+import sounddevice as sd
+
+# Formato PCM pedido ao ElevenLabs para reprodução em streaming (16 bits, mono)
+STREAM_SAMPLE_RATE = 22050
+STREAM_OUTPUT_FORMAT = f"pcm_{STREAM_SAMPLE_RATE}"
+# Duração de cada escrita no stream: stop() vale no máximo depois de uma fatia
+WRITE_SLICE_SECONDS = 0.05
+
+
+class StreamingAudioPlayer:
+    """Reproduz áudio PCM em memória por um único stream de saída persistente."""
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE, device=None):
+        self.sample_rate = sample_rate
+        self.device = device
+        self.stream = None
+        self.stream_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.last_time_to_first_audio = None
+        # Bytes de uma fatia (amostras de 16 bits)
+        self.slice_bytes = max(2, int(sample_rate * WRITE_SLICE_SECONDS) * 2)
+
+    def _ensure_stream(self):
+        """Abre o stream de saída na primeira utilização e o mantém aberto."""
+        if self.stream is None:
+            self.stream = sd.RawOutputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype='int16',
+                device=self.device
+            )
+            self.stream.start()
+            logging.info(f"Stream de saída de áudio aberto ({self.sample_rate} Hz)")
+        return self.stream
+
+    def play(self, chunks, started_at=None):
+        """Toca os blocos PCM à medida que chegam. Retorna o tempo até o primeiro áudio."""
+        started_at = started_at if started_at is not None else time.perf_counter()
+        self.stop_event.clear()
+        time_to_first_audio = None
+        leftover = b''
+
+        with self.stream_lock:
+            stream = self._ensure_stream()
+            for chunk in chunks:
+                if self.stop_event.is_set():
+                    break
+                if not chunk:
+                    continue
+                # Amostras de 16 bits podem chegar divididas entre dois blocos
+                data = leftover + chunk
+                usable = len(data) - (len(data) % 2)
+                leftover = data[usable:]
+                # Frases do cache chegam inteiras em um bloco: escreve em fatias curtas
+                # para que uma interrupção não espere a frase terminar
+                for offset in range(0, usable, self.slice_bytes):
+                    if self.stop_event.is_set():
+                        break
+                    stream.write(data[offset:min(offset + self.slice_bytes, usable)])
+                    if time_to_first_audio is None:
+                        time_to_first_audio = time.perf_counter() - started_at
+                        self.last_time_to_first_audio = time_to_first_audio
+                        logging.info(f"Tempo até o primeiro áudio: {time_to_first_audio * 1000:.0f} ms")
+            if self.stop_event.is_set():
+                logging.info("Reprodução interrompida")
+
+        return time_to_first_audio
+
+    def stop(self):
+        """Interrompe a reprodução em andamento."""
+        self.stop_event.set()
+
+    def close(self):
+        with self.stream_lock:
+            if self.stream is not None:
+                self.stream.stop()
+                self.stream.close()
+                self.stream = None
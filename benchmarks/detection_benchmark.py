@@ -0,0 +1,114 @@
+# benchmarks/detection_benchmark.py
+# Uso: python -m benchmarks.detection_benchmark [imagens...] [--backends pytorch onnx openvino] [--imgsz 640 416]
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+from detection import ObjectDetector, DETECTION_BACKENDS
+from benchmarks.fixtures import list_image_fixtures
+
+
+def load_images(paths, camera=None, frames=20):
+    """Carrega as imagens de teste ou captura alguns quadros da câmera."""
+    images = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Aviso: não foi possível ler {path}")
+        else:
+            images.append(image)
+    if camera is not None:
+        cap = cv2.VideoCapture(camera)
+        for _ in range(frames):
+            ret, frame = cap.read()
+            if ret:
+                images.append(frame)
+            time.sleep(0.1)
+        cap.release()
+    return images
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def compare(detections, reference, threshold=0.5):
+    """Casa as detecções com as de referência (mesma classe, IoU >= threshold)."""
+    matched = 0
+    used = set()
+    for name, _, box in detections:
+        for index, (ref_name, _, ref_box) in enumerate(reference):
+            if index not in used and name == ref_name and iou(box, ref_box) >= threshold:
+                used.add(index)
+                matched += 1
+                break
+    return matched
+
+
+def run_backend(backend, imgsz, threads, images, repeat):
+    detector = ObjectDetector(backend=backend, imgsz=imgsz, threads=threads)
+    started = time.perf_counter()
+    model = detector.load()
+    load_time = time.perf_counter() - started
+    detector.warmup(model)
+
+    outputs = [detector.detect(model, image) for image in images]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for image in images:
+            detector.detect(model, image)
+    elapsed = time.perf_counter() - started
+    fps = repeat * len(images) / elapsed if elapsed > 0 else 0.0
+    return detector.backend, load_time, fps, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara FPS e precisão dos backends de detecção com o PyTorch.")
+    parser.add_argument('paths', nargs='*', help="Imagens (padrão: benchmarks/fixtures/*.jpg|png)")
+    parser.add_argument('--camera', type=int, default=None, help="Captura quadros desta câmera")
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--backends', nargs='+', default=list(DETECTION_BACKENDS))
+    parser.add_argument('--imgsz', nargs='+', type=int, default=[640])
+    parser.add_argument('--threads', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.paths or list_image_fixtures(), args.camera, args.frames)
+    if not images:
+        print("Nenhuma imagem de teste. Coloque imagens em benchmarks/fixtures ou use --camera.")
+        return 1
+
+    # Referência: o caminho atual (PyTorch, 640px)
+    _, _, reference_fps, reference = run_backend("pytorch", 640, args.threads, images, args.repeat)
+    reference_total = sum(len(detections) for detections in reference)
+
+    print(f"{len(images)} imagens, {reference_total} objetos na referência (PyTorch 640px, {reference_fps:.1f} FPS)\n")
+    print(f"{'backend':<12}{'imgsz':>6}{'carga (s)':>11}{'FPS':>8}{'ganho':>8}{'precisão':>10}{'revocação':>11}{'top-1':>8}")
+    for backend in args.backends:
+        for imgsz in args.imgsz:
+            try:
+                used_backend, load_time, fps, outputs = run_backend(backend, imgsz, args.threads, images, args.repeat)
+            except Exception as e:
+                print(f"{backend:<12}{imgsz:>6}  erro: {e}")
+                continue
+            total = sum(len(detections) for detections in outputs)
+            matched = sum(compare(detections, ref) for detections, ref in zip(outputs, reference))
+            top1 = np.mean([
+                bool(detections) == bool(ref) and (not ref or detections[0][0] == ref[0][0])
+                for detections, ref in zip(outputs, reference)
+            ])
+            precision = matched / total if total else 1.0
+            recall = matched / reference_total if reference_total else 1.0
+            label = used_backend if used_backend == backend else f"{backend}->{used_backend}"
+            print(f"{label:<12}{imgsz:>6}{load_time:>11.2f}{fps:>8.1f}{fps / reference_fps:>7.2f}x"
+                  f"{precision:>10.2f}{recall:>11.2f}{top1:>8.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# benchmarks/face_index_benchmark.py
+# Uso: python -m benchmarks.face_index_benchmark [--users 50000] [--queries 500]
+import os
+import sys
+import time
+import tempfile
+import argparse
+import numpy as np
+import database
+from face_index import FaceIndex
+
+
+def naive_identify(users, embedding, threshold):
+    """O caminho antigo: decodifica e compara usuário por usuário."""
+    best_name, best_score = None, threshold
+    query = np.asarray(embedding) / np.linalg.norm(embedding)
+    for _, name, encoding in users:
+        vector = np.asarray(encoding)
+        score = float(vector @ query / np.linalg.norm(vector))
+        if score >= best_score:
+            best_name, best_score = name, score
+    return best_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a identificação facial com o índice vetorizado.")
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--naive-queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        # Banco e índice descartáveis: o banco real não é tocado
+        database.DATABASE_FILE = os.path.join(directory, 'database.db')
+        database.setup_database()
+        embeddings = rng.normal(size=(args.users, args.dim))
+        with database.connect() as conn:
+            conn.executemany(
+                'INSERT INTO users (name, encoding) VALUES (?, ?)',
+                ((f"usuario_{i}", database.encode_embedding(vector)) for i, vector in enumerate(embeddings))
+            )
+
+        index = FaceIndex(directory=directory)
+        started = time.perf_counter()
+        index.load()
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reopened = FaceIndex(directory=directory)
+        reopened.load()
+        open_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.enroll("novo_usuario", rng.normal(size=args.dim))
+        enroll_time = time.perf_counter() - started
+
+        targets = rng.integers(0, args.users, args.queries)
+        # Consultas com ruído, como duas fotos diferentes da mesma pessoa
+        queries = embeddings[targets] + rng.normal(scale=0.3, size=(args.queries, args.dim))
+        started = time.perf_counter()
+        results = [reopened.identify(query) for query in queries]
+        identify_time = time.perf_counter() - started
+        correct = sum(1 for target, result in zip(targets, results) if result and result[1] == f"usuario_{target}")
+
+        users = database.get_users()
+        started = time.perf_counter()
+        for query in queries[:args.naive_queries]:
+            naive_identify(users, query, index.threshold)
+        naive_time = time.perf_counter() - started
+
+    print(f"{args.users} usuários, codificações de {args.dim} dimensões")
+    print(f"Construção do índice: {build_time:.2f} s; reabertura: {open_time * 1000:.1f} ms")
+    print(f"Cadastro incremental: {enroll_time * 1000:.1f} ms")
+    print(f"Identificação (índice): {identify_time / args.queries * 1000:.2f} ms por rosto, {correct}/{args.queries} corretas")
+    print(f"Identificação (laço):   {naive_time / args.naive_queries * 1000:.2f} ms por rosto")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
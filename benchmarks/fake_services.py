@@ -0,0 +1,208 @@
+# benchmarks/fake_services.py
+# Servidores locais que imitam o OpenAI, o ElevenLabs e a WeatherAPI, com latência configurável.
+import json
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from stt_engines import RecognizerBackend
+
+
+class FakeServiceConfig:
+    """Latências (ms) e tamanhos das respostas simuladas."""
+
+    def __init__(self, llm_first_token_ms=300, llm_token_ms=20, llm_tokens=40,
+                 tts_first_chunk_ms=250, tts_chunk_ms=30, tts_bytes_per_char=900, tts_chunk_bytes=4096,
+                 voices_ms=150, weather_ms=120, stt_ms=400, stt_realtime_factor=0.1):
+        self.llm_first_token_ms = llm_first_token_ms
+        self.llm_token_ms = llm_token_ms
+        self.llm_tokens = llm_tokens
+        self.tts_first_chunk_ms = tts_first_chunk_ms
+        self.tts_chunk_ms = tts_chunk_ms
+        self.tts_bytes_per_char = tts_bytes_per_char
+        self.tts_chunk_bytes = tts_chunk_bytes
+        self.voices_ms = voices_ms
+        self.weather_ms = weather_ms
+        self.stt_ms = stt_ms
+        self.stt_realtime_factor = stt_realtime_factor
+
+
+# Frase usada para montar as respostas da IA simulada
+LLM_WORDS = (
+    "Claro! Esta é uma resposta simulada da Eva para medir a latência. "
+    "Ela tem várias frases, como uma resposta de verdade. "
+    "Assim dá para ver quando o primeiro áudio começa a tocar."
+).split()
+
+
+def _sleep_ms(ms):
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(body or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith('/v1/voices'):
+            _sleep_ms(self.config.voices_ms)
+            self._send_json({"voices": [
+                {"voice_id": "fake-rachel", "name": "Rachel", "category": "premade"},
+                {"voice_id": "fake-adam", "name": "Adam", "category": "premade"},
+            ]})
+        elif url.path.endswith('/forecast.json'):
+            _sleep_ms(self.config.weather_ms)
+            city = parse_qs(url.query).get('q', ['São Paulo'])[0]
+            self._send_json({
+                "location": {"name": city},
+                "forecast": {"forecastday": [{"day": {
+                    "condition": {"text": "Parcialmente nublado"},
+                    "daily_chance_of_rain": 20,
+                }}]},
+            })
+        else:
+            self._send_json({"error": {"message": "not found"}}, status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.endswith('/chat/completions'):
+            self._chat_completions(self._read_json())
+        elif '/v1/text-to-speech/' in url.path:
+            self._text_to_speech(self._read_json())
+        else:
+            self._read_json()
+            self._send_json({"error": {"message": "not found"}}, status=404)
+
+    def _completion_tokens(self):
+        count = self.config.llm_tokens
+        words = [LLM_WORDS[i % len(LLM_WORDS)] for i in range(count)]
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _chat_completions(self, request):
+        model = request.get("model", "gpt-3.5-turbo")
+        tokens = self._completion_tokens()
+        _sleep_ms(self.config.llm_first_token_ms)
+        if not request.get("stream"):
+            _sleep_ms(self.config.llm_token_ms * max(0, len(tokens) - 1))
+            self._send_json({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+            return
+
+        self._start_chunked('text/event-stream')
+        for i, token in enumerate(tokens):
+            if i:
+                _sleep_ms(self.config.llm_token_ms)
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._end_chunked()
+
+    def _text_to_speech(self, request):
+        total = max(2, len(request.get("text", "")) * self.config.tts_bytes_per_char)
+        total -= total % 2
+        _sleep_ms(self.config.tts_first_chunk_ms)
+        self._start_chunked('audio/mpeg')
+        sent = 0
+        while sent < total:
+            if sent:
+                _sleep_ms(self.config.tts_chunk_ms)
+            size = min(self.config.tts_chunk_bytes, total - sent)
+            # Silêncio PCM de 16 bits
+            self._write_chunk(b'\x00' * size)
+            sent += size
+        self._end_chunked()
+
+
+class FakeRecognizer(RecognizerBackend):
+    """Substituto do reconhecimento de fala: devolve a transcrição conhecida após a latência configurada."""
+
+    name = "fake"
+    label = "Simulado"
+
+    def __init__(self, config, transcripts):
+        self.config = config
+        self.transcripts = transcripts
+        self.next_index = 0
+
+    def transcribe(self, audio):
+        duration = 0.0
+        if audio is not None:
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        _sleep_ms(self.config.stt_ms + duration * 1000 * self.config.stt_realtime_factor)
+        text = self.transcripts[self.next_index % len(self.transcripts)]
+        self.next_index += 1
+        return text
+
+
+def start_fake_services(config=None, host='127.0.0.1', port=0):
+    """Inicia os serviços simulados em um thread. Retorna (servidor, url_base)."""
+    server = ThreadingHTTPServer((host, port), FakeServiceHandler)
+    server.daemon_threads = True
+    server.config = config or FakeServiceConfig()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Sobe os serviços simulados para usar o assistente sem contas reais.")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    server, base_url = start_fake_services(port=args.port)
+    print("Serviços simulados em execução. Configure no settings.json:")
+    print(json.dumps({
+        "openai_base_url": f"{base_url}/v1",
+        "elevenlabs_base_url": base_url,
+        "weatherapi_base_url": f"{base_url}/v1",
+    }, indent=4))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
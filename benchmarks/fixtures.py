@@ -0,0 +1,53 @@
+# benchmarks/fixtures.py
+import os
+import glob
+import wave
+import subprocess
+import speech_recognition as sr
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE_SAMPLE_RATE = 16000
+
+
+def load_audio(path, sample_rate=FIXTURE_SAMPLE_RATE):
+    """Carrega um arquivo de áudio como sr.AudioData mono de 16 bits."""
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as f:
+            if f.getnchannels() == 1 and f.getsampwidth() == 2:
+                audio = sr.AudioData(f.readframes(f.getnframes()), f.getframerate(), 2)
+                return sr.AudioData(audio.get_raw_data(convert_rate=sample_rate), sample_rate, 2)
+
+    # Outros formatos (ex.: os temp_audio_*.mp3) são decodificados pelo ffmpeg
+    pcm = subprocess.run(
+        ['ffmpeg', '-v', 'quiet', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-'],
+        check=True, capture_output=True
+    ).stdout
+    return sr.AudioData(pcm, sample_rate, 2)
+
+
+def load_transcript(path):
+    """Retorna a transcrição esperada (arquivo .txt com o mesmo nome), se existir."""
+    transcript_path = os.path.splitext(path)[0] + '.txt'
+    if os.path.exists(transcript_path):
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    return None
+
+
+def list_fixtures(directory=FIXTURES_DIR, extra_patterns=('temp_audio_*.mp3',)):
+    """Lista os áudios de teste do diretório de fixtures e da raiz do projeto."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = []
+    for pattern in ('*.wav', '*.mp3'):
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    for pattern in extra_patterns:
+        paths.extend(glob.glob(os.path.join(root, pattern)))
+    return sorted(paths)
+
+
+def list_image_fixtures(directory=FIXTURES_DIR):
+    """Lista as imagens de teste do diretório de fixtures."""
+    paths = []
+    for pattern in ('*.jpg', '*.jpeg', '*.png'):
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
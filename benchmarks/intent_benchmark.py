@@ -0,0 +1,88 @@
+# benchmarks/intent_benchmark.py
+# Uso: python -m benchmarks.intent_benchmark [--intents 3000] [--queries 2000]
+import sys
+import time
+import random
+import argparse
+from intents import IntentRegistry
+
+WORDS = (
+    "qual que como quando onde quem você eu minha meu hoje agora música tempo hora dia "
+    "nome idade piada voz câmera objeto previsão chuva tocar parar diga conte me faça "
+    "sobre isso isto esse gosta fazer sabe criou criadores anos data horário elogie"
+).split()
+
+
+def random_phrase(rng, min_words=2, max_words=5):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def build_intents(count, keywords_per_intent, rng):
+    return [
+        (f"intent_{i}", [random_phrase(rng, 3, 5) for _ in range(keywords_per_intent)])
+        for i in range(count)
+    ]
+
+
+def build_queries(count, intents, rng, hit_ratio=0.5):
+    """Frases aleatórias; parte delas contém uma palavra-chave registrada."""
+    queries = []
+    for _ in range(count):
+        text = random_phrase(rng, 4, 10)
+        if rng.random() < hit_ratio:
+            _, keywords = rng.choice(intents)
+            text = f"{random_phrase(rng, 1, 3)} {rng.choice(keywords)} {random_phrase(rng, 1, 3)}"
+        queries.append(text)
+    return queries
+
+
+def naive_match(intents, text):
+    """A antiga cadeia de if/elif: testa cada intenção em ordem com any()."""
+    for name, keywords in intents:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a cadeia de if/elif com o autômato de intenções.")
+    parser.add_argument('--intents', type=int, default=3000)
+    parser.add_argument('--keywords', type=int, default=4, help="Palavras-chave por intenção")
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    intents = build_intents(args.intents, args.keywords, rng)
+    queries = build_queries(args.queries, intents, rng)
+
+    registry = IntentRegistry()
+    started = time.perf_counter()
+    for name, keywords in intents:
+        registry.register(name, keywords)
+    registry.compile()
+    compile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    expected = [naive_match(intents, text) for text in queries]
+    naive_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = []
+    for text in queries:
+        match = registry.match(text)
+        results.append(match.name if match else None)
+    automaton_time = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(expected, results) if a != b)
+    hits = sum(1 for name in results if name)
+    print(f"{args.intents} intenções, {args.intents * args.keywords} palavras-chave, {len(queries)} frases ({hits} reconhecidas)")
+    print(f"Compilação do autômato: {compile_time * 1000:.1f} ms")
+    print(f"Cadeia if/elif: {naive_time / len(queries) * 1e6:.1f} µs por frase")
+    print(f"Autômato:       {automaton_time / len(queries) * 1e6:.1f} µs por frase")
+    print(f"Resultados divergentes: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# benchmarks/stt_benchmark.py
+# Uso: python -m benchmarks.stt_benchmark [--engines vosk google] [arquivos...]
+import time
+import argparse
+from benchmarks.fixtures import load_audio, load_transcript, list_fixtures
+from stt_engines import STT_BACKENDS
+
+
+def word_error_rate(reference, hypothesis):
+    ref = reference.lower().split()
+    hyp = (hypothesis or "").lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    distances = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            current = distances[j]
+            distances[j] = min(distances[j] + 1, distances[j - 1] + 1, previous + (ref_word != hyp_word))
+            previous = current
+    return distances[-1] / len(ref)
+
+
+def run(engines, paths):
+    for engine_name in engines:
+        backend = STT_BACKENDS[engine_name]()
+        total_audio = 0.0
+        total_time = 0.0
+        errors = []
+        print(f"\n== {backend.label} ==")
+        for path in paths:
+            audio = load_audio(path)
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            start = time.perf_counter()
+            text = backend.transcribe(audio)
+            elapsed = time.perf_counter() - start
+            total_audio += duration
+            total_time += elapsed
+
+            reference = load_transcript(path)
+            wer = word_error_rate(reference, text) if reference is not None else None
+            if wer is not None:
+                errors.append(wer)
+            wer_str = f" WER={wer:.2f}" if wer is not None else ""
+            print(f"{path}: {elapsed * 1000:.0f} ms ({duration:.1f} s de áudio){wer_str} -> {text!r}")
+
+        if total_audio:
+            print(f"Fator de tempo real: {total_time / total_audio:.3f}")
+        if errors:
+            print(f"WER médio: {sum(errors) / len(errors):.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compara os motores de reconhecimento de fala em áudios gravados.")
+    parser.add_argument('paths', nargs='*', help="Arquivos de áudio (padrão: benchmarks/fixtures e temp_audio_*.mp3)")
+    parser.add_argument('--engines', nargs='+', default=list(STT_BACKENDS), choices=list(STT_BACKENDS))
+    args = parser.parse_args()
+    run(args.engines, args.paths or list_fixtures())
@@ -0,0 +1,255 @@
+# benchmarks/turn_benchmark.py
+# Uso: python -m benchmarks.turn_benchmark [--turns 20] [--update-baseline]
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import tempfile
+from speech_pipeline import PipelinedSpeaker, split_sentences
+from benchmarks.fixtures import load_audio, load_transcript, list_fixtures
+from benchmarks.fake_services import FakeServiceConfig, FakeRecognizer, start_fake_services
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'turn_baseline.json')
+STAGES = ['stt', 'queue', 'route', 'llm_first_token', 'llm_total', 'first_audio', 'turn_total']
+
+DEFAULT_QUESTIONS = [
+    "Qual é a capital da França?",
+    "Me explique como funciona a fotossíntese.",
+    "Qual é o maior planeta do sistema solar?",
+]
+
+
+class NullAudioPlayer:
+    """Consome o áudio sem tocar; com realtime=True espera a duração real do PCM."""
+
+    def __init__(self, sample_rate, realtime=False):
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+
+    def play(self, chunks, started_at=None):
+        started_at = started_at if started_at is not None else time.perf_counter()
+        time_to_first_audio = None
+        for chunk in chunks:
+            if time_to_first_audio is None:
+                time_to_first_audio = time.perf_counter() - started_at
+            if self.realtime:
+                time.sleep(len(chunk) / (self.sample_rate * 2))
+        return time_to_first_audio
+
+    def stop(self):
+        pass
+
+
+class BenchmarkVoice:
+    """Voz do assistente no benchmark: STT simulado e síntese contra os serviços simulados."""
+
+    streaming_enabled = True
+    using_cloned_voice = False
+
+    def __init__(self, recognizer, audios, synthesize, player):
+        self.recognizer = recognizer
+        self.audios = audios
+        self.synthesize = synthesize
+        self.player = player
+        self.next_index = 0
+        self.last_time_to_first_audio = None
+
+    def listen(self, on_partial=None):
+        audio = self.audios[self.next_index % len(self.audios)]
+        self.next_index += 1
+        return self.recognizer.transcribe(audio)
+
+    def begin_speech(self):
+        return PipelinedSpeaker(self.synthesize, self.player)
+
+    def finish_speech(self, speech):
+        speech.close()
+        speech.wait()
+        self.last_time_to_first_audio = speech.time_to_first_audio
+
+    def speak(self, text):
+        speech = self.begin_speech()
+        for sentence in split_sentences(text):
+            speech.submit(sentence)
+        self.finish_speech(speech)
+
+    def stop_speaking(self):
+        pass
+
+    def start_listening(self):
+        pass
+
+    def stop_listening(self):
+        pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Percentil pelo método do posto mais próximo
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        stage: {"p50": percentile(values, 0.50), "p95": percentile(values, 0.95), "n": len(values)}
+        for stage, values in samples.items() if values
+    }
+
+
+def write_settings(workdir, base_url):
+    """Configura o assistente para usar os serviços simulados, sem caches."""
+    settings = {
+        "openai_api_key": "fake",
+        "elevenlabs_api_key": "fake",
+        "weatherapi_api_key": "fake",
+        "openai_base_url": f"{base_url}/v1",
+        "elevenlabs_base_url": base_url,
+        "weatherapi_base_url": f"{base_url}/v1",
+        "response_cache_enabled": False,
+        "tts_cache_max_mb": 0,
+        "tts_prewarm": False,
+        "log_level": "WARNING",
+    }
+    with open(os.path.join(workdir, 'settings.json'), 'w') as f:
+        json.dump(settings, f, indent=4)
+
+
+def load_turn_inputs(paths):
+    """Carrega os áudios gravados e as transcrições esperadas."""
+    audios = []
+    transcripts = []
+    for i, path in enumerate(paths):
+        try:
+            audios.append(load_audio(path))
+        except Exception as e:
+            print(f"Aviso: não foi possível decodificar {path} ({e}); usando só a latência fixa do STT")
+            audios.append(None)
+        transcripts.append(load_transcript(path) or DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)])
+    if not audios:
+        audios = [None] * len(DEFAULT_QUESTIONS)
+        transcripts = list(DEFAULT_QUESTIONS)
+    return audios, transcripts
+
+
+def run_turns(turns, audios, recognizer, realtime_playback):
+    # Os módulos do assistente são importados depois de o settings.json simulado existir
+    from chatgpt_api import ChatGPT
+    from tts import SpeechSynthesizer, create_elevenlabs_client
+    from audio_stream import STREAM_OUTPUT_FORMAT, STREAM_SAMPLE_RATE
+    from conversation_engine import ConversationEngine
+
+    chatgpt = ChatGPT()
+    synthesizer = SpeechSynthesizer(create_elevenlabs_client("fake"))
+    player = NullAudioPlayer(STREAM_SAMPLE_RATE, realtime=realtime_playback)
+    voice = BenchmarkVoice(
+        recognizer, audios, lambda sentence: synthesizer.synthesize(sentence, STREAM_OUTPUT_FORMAT), player
+    )
+    # O mesmo motor da interface, sem Qt e sem câmera
+    engine = ConversationEngine(voice, chatgpt)
+    samples = {stage: [] for stage in STAGES}
+
+    def on_event(event, data):
+        if event == "error":
+            print(data['message'])
+        if event != "turn_finished":
+            return
+        for stage, value in data['timings'].items():
+            samples.setdefault(stage, []).append(value)
+        turn = len(samples['turn_total'])
+        print(f"Turno {turn}/{turns} ({data['route']}): {data['timings']['turn_total'] * 1000:.0f} ms")
+        # Cada turno parte do mesmo contexto, para o tamanho do prompt não crescer
+        chatgpt.reset_context()
+
+    engine.subscribe(on_event)
+    asyncio.run(engine.run(max_turns=turns))
+    return samples
+
+
+def compare_with_baseline(results, baseline, tolerance, slack=0.005):
+    """Retorna as etapas cujo p95 piorou além da tolerância em relação à linha de base."""
+    regressions = []
+    for stage, stats in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        limit = base["p95"] * (1 + tolerance) + slack
+        if stats["p95"] > limit:
+            regressions.append((stage, stats["p95"], limit))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a latência de turnos completos com serviços simulados.")
+    parser.add_argument('paths', nargs='*', help="Áudios gravados (padrão: benchmarks/fixtures e temp_audio_*.mp3)")
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--stt', default='fake', help="Motor de STT: 'fake' ou um motor real de stt_engines (ex.: vosk)")
+    parser.add_argument('--realtime-playback', action='store_true', help="Espera a duração real do áudio")
+    parser.add_argument('--llm-first-token-ms', type=float, default=300)
+    parser.add_argument('--llm-token-ms', type=float, default=20)
+    parser.add_argument('--llm-tokens', type=int, default=40)
+    parser.add_argument('--tts-first-chunk-ms', type=float, default=250)
+    parser.add_argument('--tts-chunk-ms', type=float, default=30)
+    parser.add_argument('--tts-bytes-per-char', type=int, default=900)
+    parser.add_argument('--stt-ms', type=float, default=400)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Piora relativa aceita no p95 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in (args.paths or list_fixtures())]
+    baseline_path = os.path.abspath(args.baseline)
+    config = FakeServiceConfig(
+        llm_first_token_ms=args.llm_first_token_ms, llm_token_ms=args.llm_token_ms, llm_tokens=args.llm_tokens,
+        tts_first_chunk_ms=args.tts_first_chunk_ms, tts_chunk_ms=args.tts_chunk_ms,
+        tts_bytes_per_char=args.tts_bytes_per_char, stt_ms=args.stt_ms
+    )
+    server, base_url = start_fake_services(config)
+
+    # Roda em um diretório temporário para não tocar no settings.json e nos caches reais
+    os.chdir(tempfile.mkdtemp(prefix='turn_benchmark_'))
+    write_settings(os.getcwd(), base_url)
+
+    audios, transcripts = load_turn_inputs(paths)
+    if args.stt == 'fake':
+        recognizer = FakeRecognizer(config, transcripts)
+    else:
+        from stt_engines import create_stt_backend
+        recognizer = create_stt_backend(args.stt)
+
+    try:
+        samples = run_turns(args.turns, audios, recognizer, args.realtime_playback)
+    finally:
+        server.shutdown()
+
+    results = summarize(samples)
+    print(f"\n{'etapa':<18}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for stage in STAGES:
+        if stage in results:
+            print(f"{stage:<18}{results[stage]['p50'] * 1000:>10.1f}{results[stage]['p95'] * 1000:>10.1f}")
+
+    if args.update_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"\nLinha de base salva em {baseline_path}")
+        return 0
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for stage, value, limit in regressions:
+            print(f"REGRESSÃO em {stage}: p95 {value * 1000:.1f} ms > limite {limit * 1000:.1f} ms")
+        if regressions:
+            return 1
+        print("\nSem regressões em relação à linha de base.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
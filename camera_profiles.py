@@ -0,0 +1,155 @@
+# camera_profiles.py
+import time
+import cv2
+import utils
+
+# Perfis de captura: resolução, taxa de quadros, formato (FOURCC) e buffer do driver.
+# "driver" não altera nada e mantém o comportamento padrão da câmera.
+CAPTURE_PROFILES = {
+    "driver": {"label": "Padrão do driver"},
+    "vga_mjpg": {"label": "640x480 MJPG 30 FPS", "width": 640, "height": 480, "fps": 30, "fourcc": "MJPG", "buffersize": 1},
+    "vga_yuyv": {"label": "640x480 YUYV 30 FPS", "width": 640, "height": 480, "fps": 30, "fourcc": "YUYV", "buffersize": 1},
+    "hd_mjpg": {"label": "1280x720 MJPG 30 FPS", "width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG", "buffersize": 1},
+    "qvga_mjpg": {"label": "320x240 MJPG 30 FPS", "width": 320, "height": 240, "fps": 30, "fourcc": "MJPG", "buffersize": 1},
+}
+DEFAULT_CAPTURE_PROFILE = "driver"
+
+
+def get_capture_profile_list():
+    return [(name, profile["label"]) for name, profile in CAPTURE_PROFILES.items()]
+
+
+def get_camera_profile(camera_index):
+    """Perfil salvo para a câmera (as configurações guardam um por índice)."""
+    name = utils.get_setting("camera_profiles", {}).get(str(camera_index), DEFAULT_CAPTURE_PROFILE)
+    return name if name in CAPTURE_PROFILES else DEFAULT_CAPTURE_PROFILE
+
+
+def set_camera_profile(camera_index, name):
+    profiles = utils.get_setting("camera_profiles", {})
+    profiles[str(camera_index)] = name
+    utils.set_setting("camera_profiles", profiles)
+
+
+def get_profile_measurements(camera_index):
+    """Medições salvas da câmera: perfil -> resultado de measure_capture()."""
+    return utils.get_setting("camera_profile_measurements", {}).get(str(camera_index), {})
+
+
+def save_profile_measurements(camera_index, measurements):
+    saved = utils.get_setting("camera_profile_measurements", {})
+    saved[str(camera_index)] = measurements
+    utils.set_setting("camera_profile_measurements", saved)
+
+
+def decode_fourcc(value):
+    value = int(value)
+    if value <= 0:
+        return ""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+
+
+def read_properties(cap):
+    """Valores que o dispositivo está usando de fato."""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+        "fourcc": decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffersize": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def apply_profile(cap, name):
+    """Negocia o perfil com a câmera e retorna o que ela aceitou.
+
+    O formato vem antes da resolução: vários drivers só oferecem as
+    resoluções maiores em MJPG. Diferenças entre o pedido e o aceito são
+    avisadas, mas não são erro.
+    """
+    profile = CAPTURE_PROFILES.get(name, CAPTURE_PROFILES[DEFAULT_CAPTURE_PROFILE])
+    if "fourcc" in profile:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile["fourcc"]))
+    if "width" in profile:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile["width"])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile["height"])
+    if "fps" in profile:
+        cap.set(cv2.CAP_PROP_FPS, profile["fps"])
+    if "buffersize" in profile:
+        # Sem fila no driver, cada leitura traz o quadro mais recente
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile["buffersize"])
+
+    accepted = read_properties(cap)
+    for key in ("width", "height", "fps", "fourcc", "buffersize"):
+        if key in profile and accepted[key] != profile[key]:
+            print(f"Câmera não aceitou {key}={profile[key]} do perfil {name}; usando {accepted[key] or 'desconhecido'}")
+    print(f"Perfil de captura {name}: {accepted['width']}x{accepted['height']} "
+          f"{accepted['fourcc'] or '?'} {accepted['fps']} FPS, buffer {accepted['buffersize']}")
+    return accepted
+
+
+def measure_capture(cap, frames=30, pause=0.5):
+    """Mede a captura: FPS real, tempo médio de leitura e quadros velhos na fila do driver.
+
+    Depois de uma pausa, leituras que voltam quase instantaneamente são
+    quadros que já estavam parados no buffer do driver, ou seja, imagens
+    atrasadas que o reconhecimento receberia.
+    """
+    for _ in range(5):
+        cap.read()  # descarta os primeiros quadros (ajuste de exposição)
+
+    read_times = []
+    started = time.perf_counter()
+    for _ in range(frames):
+        read_started = time.perf_counter()
+        ret, _ = cap.read()
+        if not ret:
+            return None
+        read_times.append(time.perf_counter() - read_started)
+    elapsed = time.perf_counter() - started
+    frame_interval = elapsed / frames
+
+    time.sleep(pause)
+    stale = 0
+    for _ in range(10):
+        read_started = time.perf_counter()
+        cap.read()
+        if time.perf_counter() - read_started > frame_interval / 4:
+            break
+        stale += 1
+
+    # Latência esperada para um quadro novo: espera pelo próximo + quadros velhos na fila
+    latency = frame_interval / 2 + stale * frame_interval
+    return {
+        "fps": round(frames / elapsed, 1),
+        "read_ms": round(sum(read_times) / frames * 1000, 1),
+        "stale_frames": stale,
+        "latency_ms": round(latency * 1000, 1),
+    }
+
+
+def open_camera(camera_index, backend, profile):
+    """Abre a câmera já com o perfil aplicado. Retorna (cap, valores aceitos ou None)."""
+    cap = cv2.VideoCapture(camera_index, backend)
+    if not cap.isOpened():
+        return cap, None
+    return cap, apply_profile(cap, profile)
+
+
+def measure_profiles(camera_index, backend, names=None):
+    """Abre a câmera com cada perfil e mede a captura. A câmera não pode estar em uso."""
+    results = {}
+    for name in names or CAPTURE_PROFILES:
+        cap, accepted = open_camera(camera_index, backend, name)
+        try:
+            if accepted is None:
+                continue
+            measurement = measure_capture(cap)
+            if measurement is not None:
+                measurement["accepted"] = accepted
+                results[name] = measurement
+                print(f"Perfil {name}: {measurement['fps']} FPS, latência estimada {measurement['latency_ms']} ms, "
+                      f"{measurement['stale_frames']} quadro(s) velho(s) no buffer")
+        finally:
+            cap.release()
+    return results
@@ -0,0 +1,99 @@
+# change_detector.py
+import time
+import threading
+import cv2
+import numpy as np
+import utils
+
+# Fração mínima da imagem que precisa mudar (1% pega um objeto pequeno na mão)
+DEFAULT_CHANGE_THRESHOLD = 0.01
+# Diferença de brilho (0 a 1) para um pixel da miniatura contar como mudado
+DEFAULT_PIXEL_THRESHOLD = 0.05
+
+
+class ChangeDetector:
+    """Detector barato de mudança de cena por diferença de quadros reduzidos.
+
+    Cada quadro vira uma miniatura em tons de cinza. A cena mudou quando a
+    fração de pixels com diferença acima de pixel_threshold passa do limiar;
+    uma média global diluiria um objeto pequeno que entrou na imagem.
+    """
+
+    def __init__(self, camera_index=0, threshold=None, size=(64, 48), pixel_threshold=None):
+        if threshold is None:
+            # Limiar por câmera: {"0": 0.01, "1": 0.02}; senão o valor geral
+            thresholds = utils.get_setting("change_thresholds", {})
+            threshold = thresholds.get(str(camera_index), utils.get_setting("change_threshold", DEFAULT_CHANGE_THRESHOLD))
+        self.threshold = float(threshold)
+        self.pixel_threshold = float(pixel_threshold if pixel_threshold is not None
+                                     else utils.get_setting("change_pixel_threshold", DEFAULT_PIXEL_THRESHOLD))
+        self.size = size
+
+    def signature(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+        # Um leve desfoque ignora o ruído do sensor
+        return cv2.GaussianBlur(small, (3, 3), 0).astype(np.float32) / 255.0
+
+    def difference(self, a, b):
+        """Fração da miniatura que mudou (de 0 a 1)."""
+        return float(np.mean(np.abs(a - b) > self.pixel_threshold))
+
+    def changed(self, a, b):
+        return self.difference(a, b) > self.threshold
+
+
+class InferenceCache:
+    """Reaproveita o resultado de uma inferência enquanto a cena não muda.
+
+    A comparação é sempre com o quadro da última inferência real, para que
+    mudanças lentas (luz, alguém se aproximando) acabem disparando uma nova.
+    """
+
+    def __init__(self, detector, max_age=None):
+        self.detector = detector
+        self.max_age = max_age if max_age is not None else utils.get_setting("change_cache_max_age", 30)
+        self.entries = {}  # chave -> (assinatura, resultado, horário, tempo de CPU)
+        self.counters = {}  # chave -> [executadas, puladas, CPU economizada]
+        self.lock = threading.Lock()
+
+    def run(self, key, image, compute):
+        """Retorna o resultado de compute(), ou o anterior se a cena de image não mudou."""
+        signature = self.detector.signature(image)
+        now = time.monotonic()
+        with self.lock:
+            counters = self.counters.setdefault(key, [0, 0, 0.0])
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[2] <= self.max_age and not self.detector.changed(entry[0], signature):
+                counters[1] += 1
+                counters[2] += entry[3]
+                print(f"Cena sem mudança: reutilizando {key} ({counters[1]} inferências puladas, "
+                      f"{counters[2]:.2f} s de CPU economizados)")
+                return entry[1]
+
+        started = time.process_time()
+        result = compute()
+        cpu_time = time.process_time() - started
+        with self.lock:
+            counters[0] += 1
+            if result:
+                self.entries[key] = (signature, result, now, cpu_time)
+            else:
+                # "Nada encontrado" não é guardado: a próxima pergunta tenta de novo
+                self.entries.pop(key, None)
+        return result
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        """Inferências executadas e puladas, e tempo de CPU economizado, por chave."""
+        with self.lock:
+            return {
+                key: {"runs": runs, "skipped": skipped, "cpu_saved": cpu_saved}
+                for key, (runs, skipped, cpu_saved) in self.counters.items()
+            }
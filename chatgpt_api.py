@@ -1,13 +1,24 @@
 # chatgpt_api.py
 from openai import OpenAI
 import utils
+import time
+import http_client
 import traceback
+from conversation_context import ConversationContext
+from response_cache import ResponseCache
 
 
 class ChatGPT:
     def __init__(self):
         self.api_key = utils.get_setting("openai_api_key", "")
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(
+            api_key=self.api_key,
+            base_url=utils.get_setting("openai_base_url", None) or None,
+            http_client=http_client.get_httpx_client("openai"),
+            timeout=http_client.get_httpx_timeout("openai"),
+            max_retries=2
+        )
+        self.last_time_to_first_token = None
 
         # Mensagem padrão de personalidade da Eva
         self.default_personality = {
@@ -21,36 +32,124 @@ class ChatGPT:
             )
         }
 
-    def get_response(self, message, context):
+        # Histórico da conversa com orçamento de tokens; turnos antigos são resumidos
+        self.model = "gpt-3.5-turbo"
+        self.context = ConversationContext(
+            self.default_personality["content"],
+            max_tokens=utils.get_setting("context_max_tokens", 1500),
+            summarizer=self.summarize,
+            model=self.model
+        )
+        self.last_prompt_tokens = None
+
+        # Cache de respostas para perguntas repetidas (não vale para perguntas que dependem do contexto)
+        self.response_cache = None
+        if utils.get_setting("response_cache_enabled", True):
+            try:
+                self.response_cache = ResponseCache(
+                    ttl=utils.get_setting("response_cache_ttl", 7 * 24 * 3600),
+                    max_entries=utils.get_setting("response_cache_max_entries", 2000)
+                )
+            except Exception as e:
+                print(f"Erro ao abrir o cache de respostas: {e}")
+                traceback.print_exc()
+        self.context_fingerprint = ResponseCache.context_fingerprint(
+            self.default_personality["content"], self.model, 0.7
+        )
+
+    def reset_context(self):
+        """Começa uma conversa nova, sem histórico."""
+        self.context.reset()
+
+    def summarize(self, previous_summary, messages, max_tokens):
+        """Resume turnos antigos da conversa para mantê-los no contexto com poucos tokens."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = (
+            "Resuma em poucas frases, em português, os fatos importantes desta conversa "
+            "para que ela possa continuar depois.\n"
+            f"Resumo anterior: {previous_summary or 'nenhum'}\n"
+            f"Novos trechos:\n{transcript}"
+        )
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    def stream_response(self, message, context=None):
+        """Gera a resposta da IA token a token, à medida que chega da API."""
+        context = context if context is not None else self.context
+        stream = None
+        tokens = []
         try:
-            # Adiciona a mensagem padrão ao contexto, se ainda não estiver presente
-            if not context or context[0] != self.default_personality:
-                context.insert(0, self.default_personality)
-
-            # Adiciona a mensagem do usuário ao contexto
-            messages = context + [{"role": "user", "content": message}]
-
-            # Envia a solicitação à API do ChatGPT
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-            )
+            # Perguntas repetidas são respondidas do cache, sem acessar a rede
+            cache_key = None
+            if self.response_cache is not None:
+                if self.response_cache.is_context_dependent(message, context.has_history()):
+                    self.response_cache.record_bypass()
+                else:
+                    cache_key = self.response_cache.make_key(message, self.context_fingerprint)
+                    cached = self.response_cache.get(cache_key)
+                    if cached is not None:
+                        self.last_time_to_first_token = 0.0
+                        print(f"Resposta obtida do cache ({self.response_cache.stats()})")
+                        context.add_turn(message, cached)
+                        yield cached
+                        return
+
+            # Monta o prompt com a personalidade, o resumo e os turnos que cabem no orçamento
+            messages = context.build_messages(message)
+            self.last_prompt_tokens = context.count_tokens(messages)
 
-            # Obtém a resposta da IA
-            assistant_message = response.choices[0].message.content
+            # Envia a solicitação à API do ChatGPT em modo streaming
+            started_at = time.perf_counter()
+            self.last_time_to_first_token = None
+            with http_client.guarded("openai"):
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    stream=True,
+                )
 
-            # Atualiza o contexto com a mensagem do usuário e da IA
-            context.extend([
-                {"role": "user", "content": message},
-                {"role": "assistant", "content": assistant_message}
-            ])
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if not token:
+                        continue
+                    if self.last_time_to_first_token is None:
+                        self.last_time_to_first_token = time.perf_counter() - started_at
+                        print(f"Tempo até o primeiro token: {self.last_time_to_first_token * 1000:.0f} ms")
+                    tokens.append(token)
+                    yield token
 
-            return assistant_message
+            # Obtém a resposta completa da IA
+            assistant_message = "".join(tokens)
+
+            # Atualiza o contexto com a mensagem do usuário e da IA (uma única vez)
+            context.add_turn(message, assistant_message)
+            if cache_key is not None and assistant_message:
+                self.response_cache.put(cache_key, message, assistant_message)
+            print(
+                f"Turno concluído: {self.last_prompt_tokens} tokens no prompt, "
+                f"{(time.perf_counter() - started_at) * 1000:.0f} ms"
+            )
         except Exception as e:
             # Trata erros e retorna uma mensagem padrão
             error_message = f"Erro ao obter resposta da IA: {str(e)}"
             print(error_message)
             traceback.print_exc()
-            return "Desculpe, ocorreu um erro ao processar sua solicitação."
+            # Com parte da resposta já entregue (e falada), o pedido de desculpas não acrescenta nada
+            if not tokens:
+                yield "Desculpe, ocorreu um erro ao processar sua solicitação."
+        finally:
+            # Também quando quem consome para no meio (interrupção ou cancelamento)
+            if stream is not None:
+                stream.close()
 
+    def get_response(self, message, context=None):
+        """Retorna a resposta completa da IA (versão bloqueante de stream_response)."""
+        return "".join(self.stream_response(message, context))
@@ -0,0 +1,132 @@
+# cli.py
+# Uso: python cli.py [--text] [--camera]
+import sys
+import asyncio
+import threading
+import argparse
+import utils
+from chatgpt_api import ChatGPT
+from conversation_engine import ConversationEngine
+
+
+class ConsoleSpeech:
+    """Fala descartada: no modo texto a resposta só é impressa."""
+
+    time_to_first_audio = None
+
+    def submit(self, sentence):
+        pass
+
+
+class ConsoleVoice:
+    """Entrada pelo teclado e saída no terminal, no lugar do microfone e do alto-falante."""
+
+    streaming_enabled = True
+    using_cloned_voice = False
+
+    def __init__(self):
+        self.last_time_to_first_audio = None
+        self.closed = False
+        # No terminal a próxima pergunta só é lida depois que a resposta termina de ser impressa
+        self.ready = threading.Event()
+        self.ready.set()
+
+    def listen(self, on_partial=None):
+        self.ready.wait()
+        try:
+            text = input("Você: ").strip()
+        except EOFError:
+            self.closed = True
+            return None
+        if text:
+            self.ready.clear()
+        return text or None
+
+    def speak(self, text):
+        pass
+
+    def begin_speech(self):
+        return ConsoleSpeech()
+
+    def finish_speech(self, speech):
+        pass
+
+    def stop_speaking(self):
+        pass
+
+    def start_listening(self):
+        pass
+
+    def stop_listening(self):
+        pass
+
+    def clone_user_voice(self):
+        return "A clonagem de voz não está disponível no modo texto."
+
+
+class ConsolePrinter:
+    """Mostra os eventos do motor no terminal."""
+
+    def __init__(self, engine, voice, echo_transcript):
+        self.engine = engine
+        self.voice = voice
+        self.echo_transcript = echo_transcript
+        self.printed = 0
+
+    def __call__(self, event, data):
+        if event in ("turn_finished", "dropped", "stopped") and isinstance(self.voice, ConsoleVoice):
+            self.voice.ready.set()
+        if event == "transcript" and self.echo_transcript:
+            print(f"Você: {data['text']}")
+        elif event == "not_understood":
+            if getattr(self.voice, "closed", False):
+                self.engine.stop()
+            elif self.echo_transcript:
+                print("Não entendi. Por favor, tente novamente.")
+        elif event == "response_partial":
+            # Imprime só o trecho novo da resposta em streaming
+            if not self.printed:
+                print("Assistente: ", end="")
+            print(data['text'][self.printed:], end="", flush=True)
+            self.printed = len(data['text'])
+        elif event == "response":
+            if self.printed:
+                print(data['text'][self.printed:])
+            else:
+                print(f"Assistente: {data['text']}")
+            self.printed = 0
+        elif event == "error":
+            print(data['message'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversa com o assistente pelo terminal, sem interface gráfica.")
+    parser.add_argument('--text', action='store_true', help="Digita as perguntas em vez de falar")
+    parser.add_argument('--camera', action='store_true', help="Ativa a câmera para as perguntas de visão")
+    args = parser.parse_args()
+
+    if args.text:
+        voice = ConsoleVoice()
+    else:
+        from voice import VoiceAssistant
+        voice = VoiceAssistant()
+
+    vision = None
+    if args.camera:
+        from vision import VisionAssistant
+        vision = VisionAssistant()
+
+    engine = ConversationEngine(voice, ChatGPT(), vision)
+    if not args.text and utils.get_setting("tts_prewarm", True):
+        voice.prewarm(engine.get_static_phrases())
+    engine.subscribe(ConsolePrinter(engine, voice, echo_transcript=not args.text))
+
+    try:
+        asyncio.run(engine.run())
+    except KeyboardInterrupt:
+        engine.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# conversation_context.py
+import threading
+import traceback
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens extras que a API conta para cada mensagem (papel e separadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter:
+    """Conta tokens com o tiktoken, ou estima (~4 caracteres por token) se não estiver instalado."""
+
+    def __init__(self, model="gpt-3.5-turbo"):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return len(text) // 4 + 1
+
+    def count_message(self, message):
+        return self.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationContext:
+    """Guarda cada turno uma única vez e monta o prompt dentro de um orçamento de tokens.
+
+    Os turnos mais antigos que não cabem são descartados; se houver um
+    summarizer, eles são resumidos em segundo plano em vez de perdidos.
+    """
+
+    def __init__(self, system_prompt, max_tokens=1500, summary_max_tokens=200,
+                 summarizer=None, model="gpt-3.5-turbo"):
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer
+        self.counter = TokenCounter(model)
+        self.lock = threading.Lock()
+        self.turns = []
+        self.summary = ""
+        self.summarizing = False
+        self.pending_summary = []
+
+    def reset(self):
+        with self.lock:
+            self.turns = []
+            self.summary = ""
+            self.pending_summary = []
+
+    def has_history(self):
+        with self.lock:
+            return bool(self.turns or self.summary)
+
+    def add_turn(self, user_message, assistant_message):
+        """Registra um turno (pergunta e resposta) e aplica o orçamento."""
+        user = {"role": "user", "content": user_message}
+        assistant = {"role": "assistant", "content": assistant_message}
+        tokens = self.counter.count_message(user) + self.counter.count_message(assistant)
+        with self.lock:
+            self.turns.append((user, assistant, tokens))
+            dropped = self._trim()
+        if dropped:
+            self._summarize_in_background(dropped)
+
+    def _summary_message(self):
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"Resumo da conversa até aqui: {self.summary}"}
+
+    def _history_budget(self):
+        """Tokens disponíveis para o histórico, já descontados o sistema, o resumo e a nova pergunta."""
+        budget = self.max_tokens - self.counter.count_message(self.system_message)
+        summary = self._summary_message()
+        if summary:
+            budget -= self.counter.count_message(summary)
+        return budget
+
+    def _trim(self, reserve=0):
+        """Remove os turnos mais antigos até caber no orçamento. Chamar com o lock."""
+        budget = self._history_budget() - reserve
+        dropped = []
+        while self.turns and sum(turn[2] for turn in self.turns) > budget:
+            dropped.append(self.turns.pop(0))
+        return dropped
+
+    def build_messages(self, user_message):
+        """Monta a lista de mensagens para a API com a nova pergunta do usuário."""
+        user = {"role": "user", "content": user_message}
+        with self.lock:
+            dropped = self._trim(reserve=self.counter.count_message(user))
+            messages = [self.system_message]
+            summary = self._summary_message()
+            if summary:
+                messages.append(summary)
+            for turn_user, turn_assistant, _ in self.turns:
+                messages.extend([turn_user, turn_assistant])
+        if dropped:
+            self._summarize_in_background(dropped)
+        messages.append(user)
+        return messages
+
+    def count_tokens(self, messages):
+        return sum(self.counter.count_message(message) for message in messages)
+
+    def _summarize_in_background(self, dropped):
+        if self.summarizer is None:
+            return
+        with self.lock:
+            self.pending_summary.extend(dropped)
+            if self.summarizing:
+                return
+            self.summarizing = True
+
+        def worker():
+            while True:
+                with self.lock:
+                    turns = self.pending_summary
+                    self.pending_summary = []
+                    previous = self.summary
+                    if not turns:
+                        self.summarizing = False
+                        return
+                try:
+                    messages = [message for user, assistant, _ in turns for message in (user, assistant)]
+                    summary = self.summarizer(previous, messages, self.summary_max_tokens)
+                    if summary:
+                        with self.lock:
+                            self.summary = summary.strip()
+                except Exception as e:
+                    print(f"Erro ao resumir o contexto: {e}")
+                    traceback.print_exc()
+
+        threading.Thread(target=worker, daemon=True).start()
@@ -0,0 +1,665 @@
+# conversation_engine.py
+import os
+import sys
+import re
+import time
+import random
+import logging
+import asyncio
+import datetime
+import threading
+import traceback
+import yt_dlp  # Importar o yt_dlp
+# Antes de importar o vlc, ajuste o PATH
+if sys.platform.startswith('win'):
+    os.environ['PATH'] += ';' + r'C:\Program Files\VideoLAN\VLC'  # Ajuste este caminho se necessário
+
+import vlc
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import utils
+import http_client
+from intents import IntentRegistry
+from intent_classifier import IntentClassifier
+from response_cache import normalize_message
+from speech_pipeline import SentenceSplitter
+
+# Palavras-chave de cada intenção respondida localmente
+GREETING_KEYWORDS = ["oi", "olá", "bom dia", "boa tarde", "boa noite", "e aí", "fala", "salve"]
+ENROLL_USER_COMMANDS = ["meu nome é", "me chamo", "pode me chamar de"]
+OBJECT_QUERY_KEYWORDS = ["o que é isso", "que objeto é esse", "o que estou segurando", "o que é isto", "identifique isto"]
+
+ASSISTANT_NAME_QUERY = ["qual é o seu nome", "como você se chama"]
+ASSISTANT_AGE_QUERY = ["quantos anos você tem", "qual é a sua idade"]
+ASSISTANT_HOBBIES_QUERY = ["quais são seus hobbies", "o que você gosta de fazer", "do que você gosta"]
+CREATOR_QUERY = ["quem são seus criadores", "quem te criou", "quem fez você"]
+
+USER_EMOTION_QUERY = ["como estou me sentindo", "qual é minha emoção", "como estou", "você sabe minha emoção"]
+USER_AGE_QUERY = ["quantos anos eu tenho", "você sabe minha idade", "qual é minha idade"]
+USER_GENDER_QUERY = ["meu gênero", "qual é meu gênero", "você sabe meu sexo", "qual é meu sexo"]
+USER_RACE_QUERY = ["minha raça", "qual é minha raça", "você sabe minha etnia", "qual é minha etnia"]
+
+TIME_QUERY_KEYWORDS = ["que horas é agora", "que horas são", "me diga as horas", "qual é o horário", "você sabe que horas são"]
+DATE_QUERY_KEYWORDS = ["que dia é hoje", "qual a data de hoje", "qual é o dia", "qual o dia de hoje"]
+WEATHER_QUERY_KEYWORDS = ["chover hoje", "vai chover hoje", "previsão do tempo", "qual a previsão para hoje", "vai chover", "previsão de chuva"]
+
+PLAY_MUSIC_COMMANDS = ["tocar música", "reproduzir música", "colocar música"]
+STOP_MUSIC_COMMANDS = ["parar música", "pausar música", "stop música"]
+
+JOKE_COMMANDS = ["conte uma piada", "me faça rir", "diga uma piada"]
+COMPLIMENT_COMMANDS = ["me elogie", "diga algo bom sobre mim", "como estou hoje?"]
+
+CLONE_VOICE_COMMANDS = ["clonar minha voz"]
+DISABLE_CLONE_VOICE_COMMANDS = ["desativar clonagem de voz"]
+
+# Intenções de atributos faciais, em ordem de prioridade, e a análise que cada uma precisa
+FACE_INTENT_ACTIONS = {'user_emotion': 'emotion', 'user_age': 'age', 'user_gender': 'gender', 'user_race': 'race'}
+FACE_INTENTS = list(FACE_INTENT_ACTIONS)
+
+# Fala nova durante uma resposta: enfileirar, descartar ou interromper a resposta atual
+OVERLAP_POLICIES = ["queue", "drop", "interrupt"]
+
+GREETING_RESPONSES = ["Olá!", "Oi!", "Como vai?", "É um prazer falar com você!", "Olá, como posso ajudar?", "Salve!"]
+
+# Respostas fixas faladas pelo assistente, pré-sintetizadas no cache de TTS
+STATIC_RESPONSES = [
+    "Voltando para a voz padrão.",
+    "Desculpe, não consegui identificar o objeto.",
+    "Câmera não disponível para reconhecer objetos.",
+    "Câmera não disponível para reconhecer você.",
+    "Desculpe, não entendi o seu nome.",
+    "Fui criada pelos alunos da Escola Estadual Sorama Geralda Richard Xavier do 2º ano.",
+    "Desculpe, não consegui determinar como você está se sentindo.",
+    "Desculpe, não consegui determinar sua idade.",
+    "Desculpe, não consegui determinar seu gênero.",
+    "Desculpe, não consegui determinar sua etnia.",
+    "Desculpe, não consegui analisar seus atributos faciais. Certifique-se de que seu rosto está visível para a câmera.",
+    "Câmera não disponível para analisar atributos faciais.",
+    "Por favor, diga o nome da música que deseja ouvir.",
+    "Música interrompida.",
+    "Nenhuma música está sendo reproduzida no momento.",
+    "Desculpe, ocorreu um erro ao tentar parar a música.",
+    "Desculpe, ocorreu um erro ao tentar reproduzir a música.",
+    "Desculpe, não consegui encontrar a música solicitada.",
+    "Desculpe, não consegui obter a previsão do tempo.",
+    "Desculpe, não consegui obter a previsão do tempo no momento.",
+    "Desculpe, ocorreu um erro ao processar sua solicitação.",
+]
+
+
+def extract_name(user_input, keyword):
+    """Nome dito depois da palavra-chave ("meu nome é Ana Clara" -> "Ana Clara")."""
+    position = user_input.lower().find(keyword)
+    if position < 0:
+        return None
+    words = re.sub(r'[^\w\s-]', ' ', user_input[position + len(keyword):]).split()[:3]
+    return ' '.join(word.capitalize() for word in words) or None
+
+
+class ConversationEngine:
+    """Núcleo da conversa, sem interface: escuta, decide, responde e fala.
+
+    O laço roda em asyncio e delega as chamadas bloqueantes (microfone, IA,
+    síntese) a threads. O andamento é publicado como eventos para quem assinar
+    com subscribe(): a janela, a linha de comando ou um teste.
+    """
+
+    def __init__(self, voice_assistant, chatgpt, vision_assistant=None):
+        self.voice_assistant = voice_assistant
+        self.chatgpt = chatgpt
+        self.vision_assistant = vision_assistant
+        self.listeners = []
+        self.running = False
+        # Cada start() abre uma sessão nova; um laço de uma sessão antiga apenas termina
+        self.session = 0
+        self.thread = None
+        self.media_player = None  # Para reprodução de música
+        self.music_mode = False  # Adicionado para controlar o modo música
+
+        # Estágios sobrepostos: o que fazer com uma fala nova enquanto a anterior é respondida
+        self.overlap_policy = utils.get_setting("overlap_policy", "queue")
+        if self.overlap_policy not in OVERLAP_POLICIES:
+            self.overlap_policy = "queue"
+        self.responding = False
+        self.capture_paused = False
+        self.cancel_event = threading.Event()
+
+        # Análises de visão iniciadas a partir das transcrições parciais
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self.prefetched = {}
+        # Quanto a saudação espera pelo reconhecimento do usuário antes de responder sem o nome
+        self.greeting_identify_timeout = utils.get_setting("greeting_identify_timeout", 0.7)
+        self.capturing_prefetched = {}
+
+        # Personalidade do Assistente
+        self.assistant_name = "Eva"
+        self.assistant_age = "1 ano"
+        self.assistant_hobbies = ["conversar com pessoas", "aprender coisas novas", "ajudar no que for preciso"]
+
+        # Lista de piadas para contar
+        self.jokes = [
+            "Por que o programador foi ao médico? Porque ele tinha muitos bugs!",
+            "O que o Java disse para o C? Você tem classe!",
+            "Qual é o fim da picada? Quando o mosquito vai embora."
+        ]
+
+        # Lista de elogios
+        self.compliments = [
+            "Você é uma pessoa incrível!",
+            "Seu sorriso é contagiante!",
+            "Você tem um ótimo senso de humor!"
+        ]
+
+        # Intenções compiladas uma única vez em um só autômato
+        self.intents = self.build_intents()
+        # Classificador aproximado para transcrições que erram a frase exata
+        self.intent_classifier = IntentClassifier(self.intents)
+
+    @property
+    def camera_available(self):
+        return self.vision_assistant is not None and self.vision_assistant.camera_available
+
+    def subscribe(self, listener):
+        """Registra listener(evento, dados), chamado a partir da thread do motor."""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def emit(self, event, **data):
+        for listener in list(self.listeners):
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"Erro ao tratar o evento {event}: {e}")
+                traceback.print_exc()
+
+    def get_static_phrases(self):
+        """Retorna todas as frases que o assistente fala sem depender da IA."""
+        hobbies_str = ", ".join(self.assistant_hobbies)
+        return (
+            GREETING_RESPONSES + self.jokes + self.compliments + STATIC_RESPONSES + [
+                f"Meu nome é {self.assistant_name}.",
+                f"Eu tenho {self.assistant_age} de existência.",
+                f"Eu gosto de {hobbies_str}.",
+            ]
+        )
+
+    def start(self):
+        """Inicia a conversa em uma thread própria com seu laço asyncio."""
+        if self.running:
+            return
+        self.running = True
+        self.session += 1
+        self.thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Encerra a conversa: para de ouvir, interrompe a fala e a música."""
+        self.running = False
+        self.voice_assistant.stop_listening()
+        self.voice_assistant.stop_speaking()
+
+        # Parar música ao encerrar conversa
+        if self.media_player is not None:
+            self.media_player.stop()
+            self.media_player = None
+            self.music_mode = False  # Desativar o modo música
+
+    async def run(self, max_turns=None):
+        """Executa a conversa até stop() ou até max_turns turnos respondidos.
+
+        A captura e o reconhecimento da próxima fala rodam em paralelo com a
+        resposta atual; as frases reconhecidas passam por uma fila limitada.
+        """
+        self.running = True
+        session = self.session
+        self.voice_assistant.start_listening()
+        self.set_vision_active(True)
+        # Cada conversa começa com um contexto novo
+        self.chatgpt.reset_context()
+        utterances = asyncio.Queue(maxsize=max(1, int(utils.get_setting("utterance_queue_size", 2))))
+        capture = asyncio.create_task(self.capture_loop(session, utterances))
+        turns = 0
+        try:
+            while self.is_current(session) and (max_turns is None or turns < max_turns):
+                item = await utterances.get()
+                if item is None:
+                    break
+                if not await self.respond(session, *item):
+                    break
+                turns += 1
+        except Exception as e:
+            print(f"Erro no fluxo de conversa: {e}")
+            traceback.print_exc()
+            self.emit("error", message="Desculpe, ocorreu um erro ao processar sua solicitação.")
+        finally:
+            capture.cancel()
+            if session == self.session:
+                self.running = False
+                self.voice_assistant.stop_listening()
+                self.set_vision_active(False)
+                self.emit("stopped")
+
+    def set_vision_active(self, active):
+        if self.camera_available:
+            self.vision_assistant.set_conversation_active(active)
+
+    def is_current(self, session):
+        return self.running and session == self.session
+
+    async def capture_loop(self, session, utterances):
+        """Estágio de captura e reconhecimento: continua ouvindo enquanto a resposta é gerada."""
+        try:
+            while self.is_current(session):
+                if self.capture_paused:
+                    await asyncio.sleep(0.05)
+                    continue
+                if not self.responding:
+                    self.emit("listening")
+                self.capturing_prefetched = {}
+                started_at = time.perf_counter()
+                user_input = await asyncio.to_thread(self.voice_assistant.listen, on_partial=self.on_partial)
+                stt = time.perf_counter() - started_at
+
+                if not self.is_current(session):
+                    break
+                if not user_input:
+                    if not self.capture_paused and not self.voice_assistant.recording_samples.is_set():
+                        self.emit("not_understood")
+                    continue
+
+                self.emit("transcript", text=user_input)
+                item = (user_input, {'stt': stt}, self.capturing_prefetched, time.perf_counter())
+                if self.responding and self.overlap_policy == 'drop':
+                    self.emit("dropped", text=user_input)
+                    continue
+                if self.responding and self.overlap_policy == 'interrupt':
+                    while not utterances.empty():
+                        utterances.get_nowait()
+                    self.interrupt()
+                # Fila limitada: com a fila cheia a captura espera a resposta atual
+                await utterances.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Erro na captura de áudio: {e}")
+            traceback.print_exc()
+        finally:
+            while not utterances.empty():
+                utterances.get_nowait()
+            utterances.put_nowait(None)
+
+    def interrupt(self):
+        """Interrompe a resposta em andamento (fala e geração) para atender a nova fala."""
+        self.cancel_event.set()
+        self.voice_assistant.stop_speaking()
+        self.emit("interrupted")
+
+    def pause_capture(self):
+        """Para de ouvir enquanto o assistente fala, para não captar a própria voz.
+
+        Com a política 'interrupt' o microfone continua aberto para o usuário
+        poder interromper (o ideal é usar fone ou cancelamento de eco).
+        """
+        if self.overlap_policy != 'interrupt':
+            self.capture_paused = True
+            self.voice_assistant.stop_listening()
+
+    def resume_capture(self, session):
+        if self.capture_paused and self.is_current(session):
+            self.voice_assistant.start_listening()
+        self.capture_paused = False
+
+    async def respond(self, session, user_input, timings, prefetched, recognized_at):
+        """Estágio de resposta: decide, gera e fala. Retorna False para encerrar a conversa."""
+        respond_started = time.perf_counter()
+        timings['queue'] = respond_started - recognized_at
+        self.prefetched = prefetched
+        self.cancel_event = threading.Event()
+        self.responding = True
+        try:
+            match = self.route(user_input)
+            timings['route'] = time.perf_counter() - respond_started
+
+            spoken = False
+            route = match.name if match is not None else "llm"
+            # Se estiver no modo música
+            if self.music_mode:
+                if match is None or not match.has('stop_music'):
+                    return False  # response = "Estou tocando música. Por favor, diga 'parar música' para interromper a música."
+                route = 'stop_music'
+                response = await asyncio.to_thread(self.stop_music)
+            elif match is not None:
+                response = await asyncio.to_thread(match.handler, user_input, match)
+            else:
+                # Obter resposta da IA usando ChatGPT
+                if self.voice_assistant.streaming_enabled:
+                    # A resposta é exibida e falada enquanto os tokens chegam
+                    response = await asyncio.to_thread(self.stream_ai_response, user_input, timings)
+                    spoken = True
+                else:
+                    llm_started = time.perf_counter()
+                    response = await asyncio.to_thread(self.chatgpt.get_response, user_input)
+                    timings['llm_total'] = time.perf_counter() - llm_started
+
+            if not spoken and not self.cancel_event.is_set():
+                self.emit("response", text=response)
+
+                # Desativar a escuta enquanto a IA fala
+                self.pause_capture()
+                timings['speech_started'] = time.perf_counter()
+                self.voice_assistant.last_time_to_first_audio = None
+                await asyncio.to_thread(self.voice_assistant.speak, response)
+
+            # Tempos contados a partir do início da fala do usuário, sem a espera na fila
+            speech_started = timings.pop('speech_started', None)
+            if speech_started is not None and self.voice_assistant.last_time_to_first_audio is not None:
+                timings['first_audio'] = (
+                    timings['stt'] + speech_started - respond_started + self.voice_assistant.last_time_to_first_audio
+                )
+            timings['turn_total'] = timings['stt'] + time.perf_counter() - respond_started
+            self.emit("turn_finished", route=route, timings=timings, interrupted=self.cancel_event.is_set())
+            return self.is_current(session)  # Sai do loop se a conversa foi encerrada
+        finally:
+            self.responding = False
+            self.resume_capture(session)
+
+    def on_partial(self, partial_text):
+        # Mostra a transcrição parcial e adianta as consultas à câmera
+        self.emit("partial_transcript", text=partial_text)
+        if not self.camera_available or self.music_mode:
+            return
+        prefetched = self.capturing_prefetched
+        matched = self.intents.matches(partial_text)
+        if 'greeting' in matched and 'enroll_user' not in matched and 'user' not in prefetched:
+            # Identifica o usuário enquanto ele ainda está falando
+            prefetched['user'] = self.prefetch_executor.submit(self.vision_assistant.identify_user)
+            return
+        if 'object' in matched and self.vision_assistant.recent_object() is not None:
+            # O rastreador já sabe o que está na frente da câmera
+            return
+        if 'object' not in prefetched and 'object' in matched:
+            prefetched['object'] = self.prefetch_executor.submit(self.vision_assistant.recognize_object)
+        else:
+            for name in FACE_INTENTS:
+                key = f'face_{FACE_INTENT_ACTIONS[name]}'
+                if name in matched and key not in prefetched:
+                    prefetched[key] = self.prefetch_executor.submit(
+                        self.vision_assistant.analyze_face_attributes, [FACE_INTENT_ACTIONS[name]]
+                    )
+                    break
+
+    def route(self, user_input):
+        """Escolhe a intenção local para a frase, ou None para a IA responder."""
+        # Todas as intenções são encontradas em uma única passada pelo texto
+        match = self.intents.match(user_input)
+        if match is None:
+            # Sem a frase exata, tenta a correspondência aproximada antes de recorrer à IA
+            candidate = self.intent_classifier.classify(user_input)
+            if candidate is not None:
+                logging.debug(f"Intenção mais próxima: {candidate.name} (pontuação {candidate.score:.2f})")
+                if candidate.score >= self.intent_classifier.threshold:
+                    match = candidate
+        return match
+
+    def begin_speech(self, timings):
+        # Só para de ouvir quando a primeira frase fica pronta para falar
+        self.pause_capture()
+        self.voice_assistant.last_time_to_first_audio = None
+        timings['speech_started'] = time.perf_counter()
+        return self.voice_assistant.begin_speech()
+
+    def stream_ai_response(self, user_input, timings=None):
+        """Publica e fala a resposta da IA à medida que os tokens chegam."""
+        timings = timings if timings is not None else {}
+        cancel_event = self.cancel_event
+        llm_started = time.perf_counter()
+        speech = None
+        splitter = SentenceSplitter()
+        response = ""
+        tokens = self.chatgpt.stream_response(user_input)
+        try:
+            for token in tokens:
+                if not self.running or cancel_event.is_set():
+                    break
+                if not response:
+                    timings['llm_first_token'] = time.perf_counter() - llm_started
+                response += token
+                self.emit("response_partial", text=response)
+                # Cada frase completa já vai para a síntese de voz
+                for sentence in splitter.feed(token):
+                    speech = speech or self.begin_speech(timings)
+                    speech.submit(sentence)
+        finally:
+            # Fecha o stream da API mesmo quando a resposta é interrompida
+            tokens.close()
+        timings['llm_total'] = time.perf_counter() - llm_started
+        self.emit("response", text=response)
+        if not self.running or cancel_event.is_set():
+            return response
+        rest = splitter.flush()
+        if rest:
+            speech = speech or self.begin_speech(timings)
+            speech.submit(rest)
+        if speech is not None:
+            self.voice_assistant.finish_speech(speech)
+        return response
+
+    def build_intents(self):
+        """Registra as intenções respondidas localmente, na ordem de prioridade."""
+        intents = IntentRegistry()
+        # Antes da saudação: "oi, meu nome é..." é um cadastro
+        intents.register('enroll_user', ENROLL_USER_COMMANDS, self.handle_enroll_user)
+        intents.register('greeting', GREETING_KEYWORDS, self.handle_greeting)
+
+        # Comandos especiais para clonagem de voz
+        intents.register('clone_voice', CLONE_VOICE_COMMANDS, lambda user_input, match: self.voice_assistant.clone_user_voice())
+        intents.register('disable_clone_voice', DISABLE_CLONE_VOICE_COMMANDS, self.handle_disable_cloned_voice)
+
+        # Reconhecimento de objetos
+        intents.register('object', OBJECT_QUERY_KEYWORDS, self.handle_object_query)
+
+        # Perguntas sobre a personalidade do assistente
+        intents.register('assistant_name', ASSISTANT_NAME_QUERY, lambda user_input, match: f"Meu nome é {self.assistant_name}.")
+        intents.register('assistant_age', ASSISTANT_AGE_QUERY, lambda user_input, match: f"Eu tenho {self.assistant_age} de existência.")
+        intents.register('assistant_hobbies', ASSISTANT_HOBBIES_QUERY, lambda user_input, match: f"Eu gosto de {', '.join(self.assistant_hobbies)}.")
+        intents.register('creator', CREATOR_QUERY, lambda user_input, match: "Fui criada pelos alunos da Escola Estadual Sorama Geralda Richard Xavier do 2º ano.")
+
+        # Piadas e elogios
+        intents.register('joke', JOKE_COMMANDS, lambda user_input, match: random.choice(self.jokes))
+        intents.register('compliment', COMPLIMENT_COMMANDS, lambda user_input, match: random.choice(self.compliments))
+
+        # Perguntas sobre atributos faciais do usuário
+        for name, keywords in zip(FACE_INTENTS, [USER_EMOTION_QUERY, USER_AGE_QUERY, USER_GENDER_QUERY, USER_RACE_QUERY]):
+            intents.register(name, keywords, self.handle_face_query)
+
+        # Data, hora e previsão do tempo
+        intents.register('time', TIME_QUERY_KEYWORDS, lambda user_input, match: f"Agora são {datetime.datetime.now().strftime('%H:%M')}.")
+        intents.register('date', DATE_QUERY_KEYWORDS, lambda user_input, match: f"Hoje é {datetime.datetime.now().strftime('%d de %B de %Y')}.")
+        intents.register('weather', WEATHER_QUERY_KEYWORDS, lambda user_input, match: self.get_weather_forecast())
+
+        # Música
+        intents.register('play_music', PLAY_MUSIC_COMMANDS, self.handle_play_music)
+        intents.register('stop_music', STOP_MUSIC_COMMANDS, lambda user_input, match: self.stop_music())
+
+        intents.compile()
+        return intents
+
+    def handle_greeting(self, user_input, match):
+        # Cumprimenta pelo nome quem já está cadastrado
+        if self.camera_available:
+            future = self.prefetched.pop('user', None) or self.prefetch_executor.submit(self.vision_assistant.identify_user)
+            try:
+                name = future.result(timeout=self.greeting_identify_timeout)
+            except FutureTimeoutError:
+                # Sem rosto à vista a cascata de detectores demora: cumprimenta sem o nome
+                name = None
+            if name:
+                return random.choice([f"Olá, {name}!", f"Oi, {name}! Como posso ajudar?", f"Que bom te ver, {name}!"])
+        return random.choice(GREETING_RESPONSES)
+
+    def handle_enroll_user(self, user_input, match):
+        if not self.camera_available:
+            return "Câmera não disponível para reconhecer você."
+        name = extract_name(user_input, match.keyword)
+        if not name:
+            return "Desculpe, não entendi o seu nome."
+        if self.vision_assistant.enroll_user(name):
+            return f"Prazer, {name}! Da próxima vez vou te reconhecer."
+        return "Desculpe, não consegui ver seu rosto. Olhe para a câmera e diga seu nome de novo."
+
+    def handle_disable_cloned_voice(self, user_input, match):
+        self.voice_assistant.using_cloned_voice = False
+        return "Voltando para a voz padrão."
+
+    def handle_object_query(self, user_input, match):
+        if not self.camera_available:
+            return "Câmera não disponível para reconhecer objetos."
+        # Resposta imediata com o que a detecção em segundo plano acabou de ver
+        object_name = self.vision_assistant.recent_object()
+        if object_name is None:
+            object_name = self.get_vision_result('object', self.vision_assistant.recognize_object)
+        else:
+            self.prefetched.pop('object', None)
+        if object_name:
+            return f"Isto parece ser um(a) {object_name}."
+        return "Desculpe, não consegui identificar o objeto."
+
+    def handle_face_query(self, user_input, match):
+        if not self.camera_available:
+            return "Câmera não disponível para analisar atributos faciais."
+        # Só roda o modelo do atributo perguntado
+        action = FACE_INTENT_ACTIONS[match.name]
+        attributes = self.get_vision_result(
+            f'face_{action}', lambda: self.vision_assistant.analyze_face_attributes([action])
+        )
+        if not attributes:
+            return "Desculpe, não consegui analisar seus atributos faciais. Certifique-se de que seu rosto está visível para a câmera."
+
+        if match.name == 'user_emotion':
+            emotion = attributes.get('dominant_emotion', '')
+            if emotion:
+                return f"Você parece estar se sentindo {emotion}."
+            return "Desculpe, não consegui determinar como você está se sentindo."
+        elif match.name == 'user_age':
+            age = attributes.get('age', '')
+            if age:
+                return f"Você aparenta ter cerca de {int(age)} anos."
+            return "Desculpe, não consegui determinar sua idade."
+        elif match.name == 'user_gender':
+            gender = attributes.get('dominant_gender', '')
+            if gender:
+                return f"Você parece ser do gênero {gender}."
+            return "Desculpe, não consegui determinar seu gênero."
+        else:
+            race = attributes.get('dominant_race', '')
+            if race:
+                return f"Você parece ser de etnia {race}."
+            return "Desculpe, não consegui determinar sua etnia."
+
+    def handle_play_music(self, user_input, match):
+        # Extrair nome da música do input do usuário
+        text, keyword = user_input.lower(), match.keyword
+        if keyword not in text:
+            # Correspondência aproximada: compara sem acentos nem pontuação
+            text, keyword = normalize_message(text), normalize_message(keyword)
+        song_name = text.partition(keyword)[2].strip()
+        if song_name:
+            return self.play_music(song_name)
+        return "Por favor, diga o nome da música que deseja ouvir."
+
+    def get_vision_result(self, key, analyze):
+        """Usa a análise iniciada pela transcrição parcial, se houver; senão executa agora."""
+        future = self.prefetched.pop(key, None)
+        if future is not None:
+            return future.result()
+        return analyze()
+
+    def get_weather_forecast(self):
+        try:
+            api_key = utils.get_setting("weatherapi_api_key", "")
+            if not api_key:
+                return "API Key da WeatherAPI.com não configurada. Por favor, configure sua API Key nas configurações."
+            city = utils.get_setting("city_name", "São Paulo")  # Cidade padrão
+            base_url = utils.get_setting("weatherapi_base_url", "http://api.weatherapi.com/v1")
+            url = f"{base_url}/forecast.json"
+            params = {"key": api_key, "q": city, "lang": "pt", "days": 1}
+            response = http_client.get("weather", url, params=params)
+            data = response.json()
+
+            if 'error' in data:
+                return "Desculpe, não consegui obter a previsão do tempo no momento."
+
+            forecast = data['forecast']['forecastday'][0]
+            day = forecast['day']
+            condition = day['condition']['text']
+            chance_of_rain = day.get('daily_chance_of_rain', 0)
+
+            response = f"A previsão para hoje em {city} é de {condition.lower()}."
+            if int(chance_of_rain) > 0:
+                response += f" Há {chance_of_rain}% de chance de chuva."
+            else:
+                response += " Não há previsão de chuva."
+            return response
+        except Exception as e:
+            print(f"Erro ao obter a previsão do tempo: {e}")
+            traceback.print_exc()
+            return "Desculpe, não consegui obter a previsão do tempo."
+
+
+    def play_music(self, song_name):
+        try:
+            # Pesquisar no YouTube
+            url = "https://www.youtube.com/results"
+            html = http_client.get("youtube", url, params={"search_query": song_name}).text
+            video_ids = re.findall(r"watch\?v=(\S{11})", html)
+            if not video_ids:
+                return "Desculpe, não consegui encontrar a música solicitada."
+
+            video_url = f"https://www.youtube.com/watch?v={video_ids[0]}"
+
+            # Usar o yt_dlp para obter o URL de streaming
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'quiet': True,
+                'no_warnings': True,
+                'socket_timeout': http_client.get_timeout("youtube")[1],
+                'retries': 2,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info_dict = ydl.extract_info(video_url, download=False)
+                audio_url = info_dict['url']
+                title = info_dict.get('title', 'música')
+
+            # Parar qualquer música que esteja tocando
+            if self.media_player is not None:
+                self.media_player.stop()
+
+            self.instance = vlc.Instance()
+            self.media_player = self.instance.media_player_new()
+            media = self.instance.media_new(audio_url)
+            media.get_mrl()
+            self.media_player.set_media(media)
+            self.media_player.play()
+
+            self.music_mode = True  # Ativar o modo música
+            return f"Iniciando a reprodução de {title}."
+        except Exception as e:
+            print(f"Erro ao reproduzir música: {e}")
+            traceback.print_exc()
+            return "Desculpe, ocorreu um erro ao tentar reproduzir a música."
+
+    def stop_music(self):
+        try:
+            if self.media_player is not None:
+                self.media_player.stop()
+                self.media_player = None
+                self.music_mode = False  # Desativar o modo música
+                return "Música interrompida."
+            else:
+                return "Nenhuma música está sendo reproduzida no momento."
+        except Exception as e:
+            print(f"Erro ao parar música: {e}")
+            traceback.print_exc()
+            return "Desculpe, ocorreu um erro ao tentar parar a música."
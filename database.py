@@ -0,0 +1,83 @@
+# database.py
+import os
+import pickle
+import contextlib
+import sqlite3
+import threading
+import utils
+
+DATABASE_FILE = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'database.db')
+
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def connect():
+    """Conexão curta com o banco: confirma ao sair sem erro e sempre fecha."""
+    with _lock:
+        conn = sqlite3.connect(DATABASE_FILE)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def setup_database():
+    """Cria as tabelas de usuários e conversas, se ainda não existirem."""
+    with connect() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                encoding BLOB NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                user_message TEXT NOT NULL,
+                assistant_response TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(user_id) REFERENCES users(id)
+            )
+        ''')
+
+
+def encode_embedding(embedding):
+    # Mesmo formato dos registros existentes: lista de floats serializada com pickle
+    return pickle.dumps([float(value) for value in embedding])
+
+
+def decode_embedding(blob):
+    return pickle.loads(blob)
+
+
+def add_user(name, embedding):
+    """Cadastra um usuário com a codificação do rosto. Retorna o id."""
+    with connect() as conn:
+        cursor = conn.execute(
+            'INSERT INTO users (name, encoding) VALUES (?, ?)', (name, encode_embedding(embedding))
+        )
+        return cursor.lastrowid
+
+
+def get_users(after_id=0):
+    """Lista (id, nome, codificação) dos usuários com id maior que after_id, em ordem de id."""
+    with connect() as conn:
+        rows = conn.execute(
+            'SELECT id, name, encoding FROM users WHERE id > ? ORDER BY id', (after_id,)
+        ).fetchall()
+    return [(user_id, name, decode_embedding(encoding)) for user_id, name, encoding in rows]
+
+
+def count_users(up_to_id=None):
+    """Quantidade de usuários (só os com id até up_to_id, se indicado) e o maior id."""
+    with connect() as conn:
+        count = conn.execute(
+            'SELECT COUNT(*) FROM users WHERE ? IS NULL OR id <= ?', (up_to_id, up_to_id)
+        ).fetchone()[0]
+        max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM users').fetchone()[0]
+    return count, max_id
+
@@ -0,0 +1,155 @@
+# detection.py
+import os
+import glob
+import shutil
+import traceback
+import numpy as np
+import torch
+from ultralytics import YOLO
+import utils
+
+DETECTION_WEIGHTS = 'yolov8s.pt'
+EXPORT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'model_cache')
+
+# Backends de detecção: nome -> (rótulo, formato de exportação do ultralytics)
+DETECTION_BACKENDS = {
+    "pytorch": ("PyTorch (original)", None),
+    "onnx": ("ONNX Runtime (CPU)", "onnx"),
+    "openvino": ("OpenVINO (CPU Intel)", "openvino"),
+}
+
+
+def get_detection_backend_list():
+    return [(name, label) for name, (label, _) in DETECTION_BACKENDS.items()]
+
+
+class ObjectDetector:
+    """Detecção de objetos com YOLO em um backend selecionável, otimizado para CPU.
+
+    Nos backends exportados o modelo é convertido uma única vez e guardado em
+    model_cache/, por formato e tamanho de entrada.
+    """
+
+    def __init__(self, weights=DETECTION_WEIGHTS, backend=None, imgsz=None, threads=None,
+                 classes=None, confidence=None, cache_dir=EXPORT_CACHE_DIR):
+        self.weights = weights
+        self.backend = backend or utils.get_setting("detection_backend", "pytorch")
+        if self.backend not in DETECTION_BACKENDS:
+            print(f"Backend de detecção desconhecido: {self.backend}. Usando PyTorch.")
+            self.backend = "pytorch"
+        self.imgsz = int(imgsz or utils.get_setting("detection_imgsz", 640))
+        self.threads = int(threads if threads is not None else utils.get_setting("detection_threads", 0))
+        # Nomes (em inglês, como no modelo) das classes a manter; vazio = todas
+        self.class_names = classes if classes is not None else utils.get_setting("detection_classes", [])
+        self.confidence = float(confidence if confidence is not None else utils.get_setting("detection_confidence", 0.25))
+        self.cache_dir = cache_dir
+        self.class_ids = None
+
+    def export_path(self):
+        """Caminho do modelo exportado no cache (None no backend PyTorch)."""
+        export_format = DETECTION_BACKENDS[self.backend][1]
+        if export_format is None:
+            return None
+        base = os.path.splitext(os.path.basename(self.weights))[0]
+        if export_format == "openvino":
+            return os.path.join(self.cache_dir, f"{base}_{self.imgsz}_openvino_model")
+        return os.path.join(self.cache_dir, f"{base}_{self.imgsz}.{export_format}")
+
+    def _export(self, path):
+        export_format = DETECTION_BACKENDS[self.backend][1]
+        print(f"Exportando {self.weights} para {export_format} ({self.imgsz}px)...")
+        exported = YOLO(self.weights).export(format=export_format, imgsz=self.imgsz, half=False, dynamic=False)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        shutil.move(str(exported), path)
+        return path
+
+    def load(self):
+        """Carrega o modelo no backend escolhido, exportando na primeira vez."""
+        if self.threads > 0:
+            # PyTorch (e o pré/pós-processamento dos outros backends)
+            torch.set_num_threads(self.threads)
+
+        path = self.export_path()
+        if path is None:
+            model = YOLO(self.weights)
+        else:
+            if not os.path.exists(path):
+                try:
+                    self._export(path)
+                except Exception as e:
+                    print(f"Erro ao exportar o modelo para {self.backend}: {e}. Usando PyTorch.")
+                    traceback.print_exc()
+                    self.backend = "pytorch"
+                    return self.load()
+            model = YOLO(path, task='detect')
+            if self.threads > 0:
+                self._apply_runtime_threads(model, path)
+
+        # Converte os nomes das classes filtradas para os índices do modelo
+        if self.class_names:
+            ids = {name: index for index, name in model.names.items()}
+            self.class_ids = [ids[name] for name in self.class_names if name in ids] or None
+        return model
+
+    def _apply_runtime_threads(self, model, path):
+        """Recria a sessão do runtime exportado com o número de threads pedido.
+
+        O ultralytics abre a sessão do ONNX Runtime e compila o modelo do
+        OpenVINO sem opção de threads, e as builds do pip não leem
+        OMP_NUM_THREADS; por isso a sessão é substituída depois de criada.
+        """
+        # A primeira predição monta o predictor e o backend do ultralytics
+        self.warmup(model)
+        backend = getattr(getattr(model, 'predictor', None), 'model', None)
+        try:
+            if self.backend == "onnx" and hasattr(backend, 'session'):
+                import onnxruntime
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = self.threads
+                options.inter_op_num_threads = 1
+                backend.session = onnxruntime.InferenceSession(
+                    path, sess_options=options, providers=backend.session.get_providers())
+            elif self.backend == "openvino" and hasattr(backend, 'ov_compiled_model'):
+                import openvino as ov
+                core = ov.Core()
+                xml_path = glob.glob(os.path.join(path, '*.xml'))[0]
+                backend.ov_compiled_model = core.compile_model(
+                    core.read_model(xml_path),
+                    device_name="CPU",
+                    config={"INFERENCE_NUM_THREADS": self.threads, "PERFORMANCE_HINT": "LATENCY"}
+                )
+            else:
+                print(f"detection_threads não pôde ser aplicado ao backend {self.backend}.")
+                return
+            print(f"Backend {self.backend} usando {self.threads} thread(s)")
+        except Exception as e:
+            print(f"Erro ao aplicar detection_threads ao backend {self.backend}: {e}")
+            traceback.print_exc()
+
+    def warmup(self, model):
+        model(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), imgsz=self.imgsz, verbose=False)
+
+    def detect(self, model, image):
+        """Retorna a lista de detecções (nome, confiança, caixa xyxy), da mais confiante para a menos."""
+        results = model(
+            image,
+            imgsz=self.imgsz,
+            conf=self.confidence,
+            classes=self.class_ids,
+            verbose=False
+        )
+        detections = []
+        for result in results:
+            if result.boxes is None or len(result.boxes) == 0:
+                continue
+            confidences = result.boxes.conf.cpu().numpy()
+            class_ids = result.boxes.cls.cpu().numpy().astype(int)
+            boxes = result.boxes.xyxy.cpu().numpy()
+            for confidence, class_id, box in zip(confidences, class_ids, boxes):
+                detections.append((result.names[class_id], float(confidence), box))
+        detections.sort(key=lambda detection: detection[1], reverse=True)
+        return detections
@@ -0,0 +1,84 @@
+# face_analysis.py
+import time
+from deepface import DeepFace
+import utils
+
+# Detectores do mais rápido para o mais lento; os seguintes só rodam se o anterior não achar rosto
+DEFAULT_FACE_DETECTORS = ['opencv', 'ssd', 'mtcnn', 'dlib']
+ALL_FACE_ACTIONS = ['age', 'gender', 'emotion', 'race']
+
+
+class FaceAnalyzer:
+    """Análise facial em cascata: detecta o rosto uma vez e só roda os modelos de atributos pedidos."""
+
+    def __init__(self, detectors=None, margin=0.15):
+        self.detectors = detectors or utils.get_setting("face_detectors", DEFAULT_FACE_DETECTORS)
+        self.margin = margin  # folga em volta do rosto recortado, em fração do tamanho
+
+    def detect(self, image):
+        """Procura o maior rosto na imagem (BGR). Retorna (recorte, detector) ou (None, None)."""
+        for backend in self.detectors:
+            try:
+                faces = DeepFace.extract_faces(image, detector_backend=backend, enforce_detection=True, align=False)
+            except ValueError:
+                # Nenhum rosto com este detector: tenta o próximo
+                continue
+            except Exception as e:
+                print(f"Erro no detector de rosto {backend}: {e}")
+                continue
+            if not faces:
+                continue
+            area = max(faces, key=lambda face: face['facial_area']['w'] * face['facial_area']['h'])['facial_area']
+            return self._crop(image, area), backend
+        return None, None
+
+    def _crop(self, image, area):
+        height, width = image.shape[:2]
+        pad_x = int(area['w'] * self.margin)
+        pad_y = int(area['h'] * self.margin)
+        x1, y1 = max(0, area['x'] - pad_x), max(0, area['y'] - pad_y)
+        x2, y2 = min(width, area['x'] + area['w'] + pad_x), min(height, area['y'] + area['h'] + pad_y)
+        return image[y1:y2, x1:x2]
+
+    def represent(self, face, model_name):
+        """Codificação (embedding) de um rosto já recortado."""
+        representation = DeepFace.represent(
+            face,
+            model_name=model_name,
+            detector_backend='skip',
+            enforce_detection=False
+        )
+        return representation[0]['embedding']
+
+    def analyze(self, image, actions=None):
+        """Detecta o rosto e analisa só as ações pedidas. Retorna o resultado com os tempos de cada etapa."""
+        actions = [action for action in (actions or ALL_FACE_ACTIONS) if action in ALL_FACE_ACTIONS]
+        timings = {}
+        started = time.perf_counter()
+        face, detector = self.detect(image)
+        timings['detect'] = time.perf_counter() - started
+        if face is None:
+            print(f"Nenhum rosto detectado ({timings['detect'] * 1000:.0f} ms)")
+            return None
+
+        result = {}
+        for action in actions:
+            started = time.perf_counter()
+            # O rosto já foi recortado: o DeepFace não precisa detectar de novo
+            analysis = DeepFace.analyze(
+                face,
+                actions=[action],
+                detector_backend='skip',
+                enforce_detection=False,
+                silent=True
+            )
+            if isinstance(analysis, list):
+                analysis = analysis[0] if analysis else {}
+            result.update(analysis)
+            timings[action] = time.perf_counter() - started
+
+        result['detector_backend'] = detector
+        result['timings'] = timings
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+        print(f"Análise facial ({detector}): {stages}")
+        return result
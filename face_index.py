@@ -0,0 +1,150 @@
+# face_index.py
+import os
+import json
+import threading
+import traceback
+import numpy as np
+import database
+import utils
+
+FACE_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'model_cache')
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class FaceIndex:
+    """Índice de identificação facial sobre a tabela users.
+
+    Todas as codificações ficam em uma única matriz float32 normalizada,
+    mapeada do disco (np.memmap): a abertura é instantânea e identificar um
+    rosto é um único produto matriz-vetor (similaridade de cosseno). Novos
+    cadastros são acrescentados ao fim, sem reconstruir o índice.
+    """
+
+    def __init__(self, model_name=None, threshold=None, directory=FACE_INDEX_DIR):
+        self.model_name = model_name or utils.get_setting("face_recognition_model", "Facenet")
+        # Similaridade de cosseno mínima para considerar a mesma pessoa
+        self.threshold = float(threshold if threshold is not None else utils.get_setting("face_match_threshold", 0.6))
+        self.matrix_path = os.path.join(directory, f"face_index_{self.model_name}.npy")
+        self.meta_path = os.path.join(directory, f"face_index_{self.model_name}.json")
+        self.matrix = None  # capacidade x dimensão; só as primeiras count linhas valem
+        self.ids = []
+        self.names = []
+        self.skipped = []  # ids com codificação de outra dimensão, fora da matriz
+        self.dim = None
+        self.lock = threading.RLock()
+
+    @property
+    def count(self):
+        return len(self.ids)
+
+    def load(self):
+        """Abre o índice salvo e acrescenta os usuários cadastrados desde então."""
+        with self.lock:
+            try:
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+                self.ids, self.names, self.dim = meta['ids'], meta['names'], meta['dim']
+                self.skipped = meta.get('skipped', [])
+                if self.matrix.shape[0] < self.count or self.matrix.shape[1] != self.dim:
+                    raise ValueError("índice inconsistente com os metadados")
+            except FileNotFoundError:
+                self._reset()
+            except Exception as e:
+                print(f"Erro ao abrir o índice facial, reconstruindo: {e}")
+                self._reset()
+            self.sync()
+
+    def sync(self):
+        """Acompanha a tabela users: acrescenta os novos e reconstrói se houve remoções."""
+        with self.lock:
+            last_id = max(self.ids[-1] if self.ids else 0, max(self.skipped, default=0))
+            # Os ids nunca são reaproveitados (AUTOINCREMENT): se algum id já visto
+            # sumiu da tabela, a contagem até last_id fica menor que a do índice
+            existing, max_id = database.count_users(up_to_id=last_id)
+            if existing != self.count + len(self.skipped) or max_id < last_id:
+                self._reset()
+                last_id = 0
+            users = database.get_users(after_id=last_id)
+            if users:
+                before = self.count
+                self._append(users)
+                print(f"Índice facial: {self.count - before} usuário(s) acrescentado(s), {self.count} no total")
+
+    def enroll(self, name, embedding):
+        """Cadastra o usuário no banco e no índice. Retorna o id."""
+        with self.lock:
+            user_id = database.add_user(name, embedding)
+            self._append([(user_id, name, embedding)])
+            return user_id
+
+    def identify(self, embedding):
+        """Retorna (id, nome, similaridade) do usuário mais parecido acima do limiar, ou None."""
+        query = normalize_rows(embedding)
+        with self.lock:
+            if not self.count or query.shape[-1] != self.dim:
+                return None
+            scores = self.matrix[:self.count] @ query
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold:
+                return None
+            return self.ids[best], self.names[best], score
+
+    def _reset(self):
+        self.matrix = None
+        self.ids, self.names, self.skipped, self.dim = [], [], [], None
+
+    def _append(self, users):
+        vectors = [embedding for _, _, embedding in users]
+        if self.dim is None:
+            self.dim = len(vectors[0])
+        keep = [index for index, embedding in enumerate(vectors) if len(embedding) == self.dim]
+        if len(keep) < len(users):
+            print(f"Índice facial: {len(users) - len(keep)} codificação(ões) com dimensão diferente de {self.dim} ignorada(s)")
+            self.skipped.extend(user[0] for index, user in enumerate(users) if index not in keep)
+        if not keep:
+            self._save_meta()
+            return
+        rows = normalize_rows([vectors[index] for index in keep])
+        start = self.count
+        self._reserve(start + len(rows))
+        self.matrix[start:start + len(rows)] = rows
+        self.matrix.flush()
+        self.ids.extend(users[index][0] for index in keep)
+        self.names.extend(users[index][1] for index in keep)
+        self._save_meta()
+
+    def _reserve(self, needed):
+        """Garante capacidade para needed linhas, dobrando o arquivo quando falta espaço."""
+        capacity = self.matrix.shape[0] if self.matrix is not None else 0
+        if needed <= capacity:
+            return
+        capacity = max(64, needed, capacity * 2)
+        os.makedirs(os.path.dirname(self.matrix_path), exist_ok=True)
+        temp_path = self.matrix_path + '.tmp.npy'
+        grown = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(capacity, self.dim))
+        if self.count:
+            grown[:self.count] = self.matrix[:self.count]
+        grown.flush()
+        # Solta os mapeamentos antes de substituir o arquivo (necessário no Windows)
+        del grown
+        self.matrix = None
+        os.replace(temp_path, self.matrix_path)
+        self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+
+    def _save_meta(self):
+        temp_path = self.meta_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'model': self.model_name, 'dim': self.dim, 'ids': self.ids, 'names': self.names,
+                           'skipped': self.skipped}, f, ensure_ascii=False)
+            os.replace(temp_path, self.meta_path)
+        except OSError as e:
+            print(f"Erro ao salvar o índice facial: {e}")
+            traceback.print_exc()
@@ -0,0 +1,173 @@
+# frame_grabber.py
+import time
+import weakref
+import threading
+import traceback
+
+
+class Frame:
+    """Quadro capturado: visão somente leitura do buffer, número de sequência e horário da captura.
+
+    O buffer fica reservado enquanto o quadro estiver em uso; use "with" ou
+    release() para devolvê-lo ao grabber assim que terminar.
+    """
+
+    def __init__(self, image, seq, timestamp, release):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp
+        self._finalizer = weakref.finalize(self, release)
+
+    @property
+    def age(self):
+        return time.monotonic() - self.timestamp
+
+    def release(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class FrameGrabber:
+    """Thread dedicada que lê a câmera sem parar e guarda apenas o quadro mais recente.
+
+    Os quadros são gravados em um conjunto pequeno de buffers reaproveitados
+    (triplo buffer). Quem consome recebe uma visão sem cópia do último buffer
+    e nunca espera pela câmera, a menos que peça um quadro mais novo.
+    """
+
+    def __init__(self, cap, max_buffers=8):
+        self.cap = cap
+        # Normalmente bastam dois ou três; cresce se consumidores seguram quadros por muito tempo
+        self.max_buffers = max_buffers
+        self.pool = []  # buffers reaproveitados
+        self.leases = []  # quantos consumidores usam cada buffer
+        self.latest_index = None
+        self.seq = 0
+        self.timestamp = None
+        self.failures = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return True
+        if self.thread is not None and self.thread.is_alive():
+            # A thread anterior ainda está presa em cap.read(): não cria uma segunda
+            print("Captura anterior ainda não terminou; não é possível reiniciar.")
+            return False
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """Para a captura e espera a thread sair (timeout=None espera o que for preciso).
+
+        Retorna False se a thread ainda estiver viva; nesse caso a câmera não
+        pode ser liberada nem reaberta.
+        """
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        thread = self.thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        if thread.is_alive():
+            return False
+        self.thread = None
+        return True
+
+    def _free_slot(self):
+        """Escolhe um buffer que não é o último publicado nem está em uso."""
+        with self.condition:
+            for index in range(len(self.pool)):
+                if index != self.latest_index and self.leases[index] == 0:
+                    return index
+            if len(self.pool) < self.max_buffers:
+                self.pool.append(None)
+                self.leases.append(0)
+                return len(self.pool) - 1
+        return None
+
+    def _capture_loop(self):
+        while self.running:
+            try:
+                index = self._free_slot()
+                if index is None:
+                    # Todos os buffers estão em uso: descarta o quadro sem decodificar
+                    self.cap.grab()
+                    continue
+
+                buffer = self.pool[index]
+                ret, image = self.cap.read(buffer) if buffer is not None else self.cap.read()
+                if not ret or image is None:
+                    self.failures += 1
+                    time.sleep(0.01)
+                    continue
+                if len(image.shape) != 3 or image.shape[2] != 3:
+                    print("Imagem capturada não está em formato RGB.")
+                    time.sleep(0.01)
+                    continue
+
+                with self.condition:
+                    # O OpenCV pode alocar um array novo se o formato mudar
+                    self.pool[index] = image
+                    self.latest_index = index
+                    self.seq += 1
+                    self.timestamp = time.monotonic()
+                    self.condition.notify_all()
+            except Exception as e:
+                print(f"Erro na captura contínua da câmera: {e}")
+                traceback.print_exc()
+                time.sleep(0.1)
+
+    def _lease(self, index):
+        self.leases[index] += 1
+        image = self.pool[index].view()
+        image.flags.writeable = False
+
+        def release():
+            with self.condition:
+                self.leases[index] -= 1
+
+        return Frame(image, self.seq, self.timestamp, release)
+
+    def latest(self, newer_than=None, timeout=1.0):
+        """Retorna o quadro mais recente, sem bloquear.
+
+        newer_than (número de sequência) faz esperar por um quadro posterior,
+        até timeout segundos. Retorna None se não houver quadro.
+        """
+        with self.condition:
+            if newer_than is not None:
+                self.condition.wait_for(lambda: not self.running or self.seq > newer_than, timeout)
+                if self.seq <= newer_than:
+                    return None
+            elif self.latest_index is None:
+                self.condition.wait_for(lambda: not self.running or self.latest_index is not None, timeout)
+            if self.latest_index is None:
+                return None
+            return self._lease(self.latest_index)
+
+    def fresh(self, timeout=1.0):
+        """Espera o próximo quadro capturado depois da chamada (para inferência)."""
+        with self.condition:
+            seq = self.seq
+        return self.latest(newer_than=seq, timeout=timeout)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "seq": self.seq,
+                "age": time.monotonic() - self.timestamp if self.timestamp is not None else None,
+                "buffers": len(self.pool),
+                "in_use": sum(1 for count in self.leases if count),
+                "failures": self.failures,
+            }
@@ -1,28 +1,39 @@
 import sys
-import os
+import time
 import threading
-import random
-import datetime
-import requests
 import traceback
-import re
-import yt_dlp  # Importar o yt_dlp
-# Antes de importar o vlc, ajuste o PATH
-if sys.platform.startswith('win'):
-    os.environ['PATH'] += ';' + r'C:\Program Files\VideoLAN\VLC'  # Ajuste este caminho se necessário
-
-import vlc
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QPushButton,
     QLabel, QHBoxLayout, QMessageBox, QComboBox, QLineEdit, QApplication
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap
 from voice import VoiceAssistant
 from vision import VisionAssistant
 import utils
-import cv2
 from chatgpt_api import ChatGPT
+from stt_engines import get_stt_backend_list
+from detection import get_detection_backend_list
+from conversation_engine import ConversationEngine
+from preview_renderer import PreviewRenderer
+import camera_profiles
+
+
+class EngineSignals(QObject):
+    """Leva os eventos do motor de conversa para a thread da interface."""
+    event = pyqtSignal(str, object)
+
+
+class PreviewSignals(QObject):
+    """Avisa a thread da interface que há um quadro de pré-visualização pronto."""
+    frame_ready = pyqtSignal()
+
+
+class CaptureSignals(QObject):
+    """Entrega à interface o resultado das operações demoradas na câmera."""
+    measured = pyqtSignal(object)  # medição dos perfis de captura
+    profile_applied = pyqtSignal(bool)  # troca do perfil da câmera em uso
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -34,39 +45,33 @@ class MainWindow(QMainWindow):
             self.vision_assistant = VisionAssistant()
             self.chatgpt = ChatGPT()
             self.is_listening = False
-            self.conversation_thread = None
-            self.media_player = None  # Para reprodução de música
-            self.music_mode = False  # Adicionado para controlar o modo música
 
-            # Inicializar contexto
-            self.context = []
+            # O motor roda fora da thread da interface; os eventos chegam por sinais enfileirados
+            self.engine = ConversationEngine(self.voice_assistant, self.chatgpt, self.vision_assistant)
+            self.engine_signals = EngineSignals()
+            self.engine_signals.event.connect(self.on_engine_event, Qt.QueuedConnection)
+            self.engine.subscribe(self.engine_signals.event.emit)
 
             self.setup_ui()
 
-            # Personalidade do Assistente
-            self.assistant_name = "Eva"
-            self.assistant_age = "1 ano"
-            self.assistant_hobbies = ["conversar com pessoas", "aprender coisas novas", "ajudar no que for preciso"]
-
-            # Lista de piadas para contar
-            self.jokes = [
-                "Por que o programador foi ao médico? Porque ele tinha muitos bugs!",
-                "O que o Java disse para o C? Você tem classe!",
-                "Qual é o fim da picada? Quando o mosquito vai embora."
-            ]
-
-            # Lista de elogios
-            self.compliments = [
-                "Você é uma pessoa incrível!",
-                "Seu sorriso é contagiante!",
-                "Você tem um ótimo senso de humor!"
-            ]
-
-            # Timer para atualizar a imagem da câmera
+            # Pré-sintetizar as frases fixas para tocarem sem latência de rede
+            if utils.get_setting("tts_prewarm", True):
+                self.voice_assistant.prewarm(self.engine.get_static_phrases())
+
+            # Pré-visualização preparada em outra thread; a interface só exibe o quadro pronto
+            self.preview = None
+            self.last_preview_stats = 0
             if self.vision_assistant.camera_available:
-                self.timer = QTimer()
-                self.timer.timeout.connect(self.update_camera_view)
-                self.timer.start(30)  # Atualiza a cada 30 ms
+                self.preview_signals = PreviewSignals()
+                self.preview_signals.frame_ready.connect(self.update_camera_view, Qt.QueuedConnection)
+                self.preview = PreviewRenderer(
+                    self.vision_assistant.frame_grabber,
+                    (self.camera_label.width(), self.camera_label.height()),
+                    self.preview_signals.frame_ready.emit,
+                    # Menos quadros enquanto há inferência ou resposta em andamento
+                    busy=lambda: self.engine.responding or self.vision_assistant.models.busy()
+                )
+                self.preview.start()
         except Exception as e:
             print(f"Erro ao iniciar a aplicação: {e}")
             traceback.print_exc()
@@ -85,9 +90,15 @@ class MainWindow(QMainWindow):
         if self.vision_assistant.camera_available:
             self.camera_label = QLabel()
             self.camera_label.setFixedSize(640, 480)
+            self.camera_label.setAlignment(Qt.AlignCenter)
             self.layout.addWidget(self.camera_label)
+            # Contador da pré-visualização: FPS, idade do quadro e CPU por quadro
+            self.preview_stats_label = QLabel()
+            self.preview_stats_label.setStyleSheet("color: gray; font-size: 10px;")
+            self.layout.addWidget(self.preview_stats_label)
         else:
             self.camera_label = None
+            self.preview_stats_label = None
 
         # Botões
         buttons_layout = QHBoxLayout()
@@ -106,16 +117,27 @@ class MainWindow(QMainWindow):
 
     def update_camera_view(self):
         try:
-            frame = self.vision_assistant.capture_image()
-            if frame is not None:
-                # Converter imagem OpenCV (BGR) para Qt (RGB)
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # O quadro já vem redimensionado e em RGB; aqui só é copiado para o QPixmap
+            item = self.preview.take()
+            if item is None:
+                return
+            index, rgb_image, timestamp, cpu = item
+            started = time.thread_time()
+            try:
                 h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qt_image)
-                self.camera_label.setPixmap(
-                    pixmap.scaled(self.camera_label.width(), self.camera_label.height(), Qt.KeepAspectRatio))
+                qt_image = QImage(rgb_image.data, w, h, ch * w, QImage.Format_RGB888)
+                self.camera_label.setPixmap(QPixmap.fromImage(qt_image))
+            finally:
+                self.preview.release(index, timestamp, cpu + time.thread_time() - started)
+
+            now = time.monotonic()
+            if now - self.last_preview_stats >= 0.5:
+                self.last_preview_stats = now
+                stats = self.preview.stats()
+                self.preview_stats_label.setText(
+                    f"{stats['fps']} FPS | quadro com {stats['frame_age'] * 1000:.0f} ms | "
+                    f"CPU {stats['cpu_per_frame'] * 1000:.1f} ms/quadro | {stats['dropped']} descartados"
+                )
         except Exception as e:
             print(f"Erro ao atualizar a visualização da câmera: {e}")
             traceback.print_exc()
@@ -124,301 +146,30 @@ class MainWindow(QMainWindow):
         if not self.is_listening:
             self.is_listening = True
             self.start_button.setText("Parar Conversa")
-            self.voice_assistant.start_listening()
-            self.conversation_thread = threading.Thread(target=self.conversation_flow)
-            self.conversation_thread.start()
+            self.engine.start()
         else:
             self.is_listening = False
             self.start_button.setText("Iniciar Conversa")
-            self.voice_assistant.stop_listening()
+            self.engine.stop()
             self.update_conversation_label("Conversa encerrada.")
 
-            # Parar música ao encerrar conversa
-            if hasattr(self, 'media_player') and self.media_player is not None:
-                self.media_player.stop()
-                self.media_player = None
-                self.music_mode = False  # Desativar o modo música
-
-    def conversation_flow(self):
-        GREETING_KEYWORDS = ["oi", "olá", "bom dia", "boa tarde", "boa noite", "e aí", "fala", "salve"]
-        GREETING_RESPONSES = ["Olá!", "Oi!", "Como vai?", "É um prazer falar com você!", "Olá, como posso ajudar?", "Salve!"]
-        OBJECT_QUERY_KEYWORDS = ["o que é isso", "que objeto é esse", "o que estou segurando", "o que é isto", "identifique isto"]
-
-        ASSISTANT_NAME_QUERY = ["qual é o seu nome", "como você se chama"]
-        ASSISTANT_AGE_QUERY = ["quantos anos você tem", "qual é a sua idade"]
-        ASSISTANT_HOBBIES_QUERY = ["quais são seus hobbies", "o que você gosta de fazer", "do que você gosta"]
-        CREATOR_QUERY = ["quem são seus criadores", "quem te criou", "quem fez você"]
-
-        USER_EMOTION_QUERY = ["como estou me sentindo", "qual é minha emoção", "como estou", "você sabe minha emoção"]
-        USER_AGE_QUERY = ["quantos anos eu tenho", "você sabe minha idade", "qual é minha idade"]
-        USER_GENDER_QUERY = ["meu gênero", "qual é meu gênero", "você sabe meu sexo", "qual é meu sexo"]
-        USER_RACE_QUERY = ["minha raça", "qual é minha raça", "você sabe minha etnia", "qual é minha etnia"]
-
-        TIME_QUERY_KEYWORDS = ["que horas é agora", "que horas são", "me diga as horas", "qual é o horário", "você sabe que horas são"]
-        DATE_QUERY_KEYWORDS = ["que dia é hoje", "qual a data de hoje", "qual é o dia", "qual o dia de hoje"]
-        WEATHER_QUERY_KEYWORDS = ["chover hoje", "vai chover hoje", "previsão do tempo", "qual a previsão para hoje", "vai chover", "previsão de chuva"]
-
-        PLAY_MUSIC_COMMANDS = ["tocar música", "reproduzir música", "colocar música"]
-        STOP_MUSIC_COMMANDS = ["parar música", "pausar música", "stop música"]
-
-        JOKE_COMMANDS = ["conte uma piada", "me faça rir", "diga uma piada"]
-        COMPLIMENT_COMMANDS = ["me elogie", "diga algo bom sobre mim", "como estou hoje?"]
-
-        # Contexto vazio (não salva mais histórico)
-        self.context = []
-
-        while self.is_listening:
+    def on_engine_event(self, event, data):
+        """Atualiza a interface com os eventos do motor (sempre na thread da interface)."""
+        if event == "listening":
             self.update_conversation_label("Você pode falar agora...")
-            user_input = self.voice_assistant.listen()
-
-            if not self.is_listening:
-                break  # Sai do loop se is_listening for False
-
-            if not user_input:
-                self.update_conversation_label("Não entendi. Por favor, tente novamente.")
-                continue
-
-            self.update_conversation_label(f"Você: {user_input}")
-
-            user_input_lower = user_input.lower()
-
-            # Se estiver no modo música
-            if self.music_mode:
-                if any(keyword in user_input_lower for keyword in STOP_MUSIC_COMMANDS):
-                    response = self.stop_music()
-                else:
-                    return #response = "Estou tocando música. Por favor, diga 'parar música' para interromper a música."
-                self.update_conversation_label(f"Assistente: {response}")
-                # Falar a resposta
-                self.voice_assistant.stop_listening()
-                self.voice_assistant.speak(response)
-                if not self.is_listening:
-                    break  # Sai do loop se is_listening for False
-                self.voice_assistant.start_listening()
-                continue  # Pula para a próxima iteração do loop
-
-            try:
-                # Verificar saudação
-                if any(keyword in user_input_lower for keyword in GREETING_KEYWORDS):
-                    response = random.choice(GREETING_RESPONSES)
-
-                # Comandos especiais para clonagem de voz
-                elif "clonar minha voz" in user_input_lower:
-                    response = self.voice_assistant.clone_user_voice()
-                elif "desativar clonagem de voz" in user_input_lower:
-                    self.voice_assistant.using_cloned_voice = False
-                    response = "Voltando para a voz padrão."
-
-                # Reconhecimento de objetos
-                elif any(keyword in user_input_lower for keyword in OBJECT_QUERY_KEYWORDS):
-                    if self.vision_assistant.camera_available:
-                        object_name = self.vision_assistant.recognize_object()
-                        if object_name:
-                            response = f"Isto parece ser um(a) {object_name}."
-                        else:
-                            response = "Desculpe, não consegui identificar o objeto."
-                    else:
-                        response = "Câmera não disponível para reconhecer objetos."
-
-                # Perguntas sobre a personalidade do assistente
-                elif any(keyword in user_input_lower for keyword in ASSISTANT_NAME_QUERY):
-                    response = f"Meu nome é {self.assistant_name}."
-                elif any(keyword in user_input_lower for keyword in ASSISTANT_AGE_QUERY):
-                    response = f"Eu tenho {self.assistant_age} de existência."
-                elif any(keyword in user_input_lower for keyword in ASSISTANT_HOBBIES_QUERY):
-                    hobbies_str = ", ".join(self.assistant_hobbies)
-                    response = f"Eu gosto de {hobbies_str}."
-                elif any(keyword in user_input_lower for keyword in CREATOR_QUERY):
-                    response = "Fui criada pelos alunos da Escola Estadual Sorama Geralda Richard Xavier do 2º ano."
-
-                # Contar piadas
-                elif any(keyword in user_input_lower for keyword in JOKE_COMMANDS):
-                    response = random.choice(self.jokes)
-
-                # Elogiar o usuário
-                elif any(keyword in user_input_lower for keyword in COMPLIMENT_COMMANDS):
-                    response = random.choice(self.compliments)
-
-                # Perguntas sobre atributos faciais do usuário
-                elif any(keyword in user_input_lower for keyword in USER_EMOTION_QUERY + USER_AGE_QUERY + USER_GENDER_QUERY + USER_RACE_QUERY):
-                    if self.vision_assistant.camera_available:
-                        attributes = self.vision_assistant.analyze_face_attributes()
-                        if attributes:
-                            if any(keyword in user_input_lower for keyword in USER_EMOTION_QUERY):
-                                emotion = attributes.get('dominant_emotion', '')
-                                if emotion:
-                                    response = f"Você parece estar se sentindo {emotion}."
-                                else:
-                                    response = "Desculpe, não consegui determinar como você está se sentindo."
-
-                            elif any(keyword in user_input_lower for keyword in USER_AGE_QUERY):
-                                age = attributes.get('age', '')
-                                if age:
-                                    response = f"Você aparenta ter cerca de {int(age)} anos."
-                                else:
-                                    response = "Desculpe, não consegui determinar sua idade."
-
-                            elif any(keyword in user_input_lower for keyword in USER_GENDER_QUERY):
-                                gender = attributes.get('dominant_gender', '')
-                                if gender:
-                                    response = f"Você parece ser do gênero {gender}."
-                                else:
-                                    response = "Desculpe, não consegui determinar seu gênero."
-
-                            elif any(keyword in user_input_lower for keyword in USER_RACE_QUERY):
-                                race = attributes.get('dominant_race', '')
-                                if race:
-                                    response = f"Você parece ser de etnia {race}."
-                                else:
-                                    response = "Desculpe, não consegui determinar sua etnia."
-                        else:
-                            response = "Desculpe, não consegui analisar seus atributos faciais. Certifique-se de que seu rosto está visível para a câmera."
-                    else:
-                        response = "Câmera não disponível para analisar atributos faciais."
-
-                # Consultas sobre data e hora
-                elif any(keyword in user_input_lower for keyword in TIME_QUERY_KEYWORDS):
-                    now = datetime.datetime.now()
-                    current_time = now.strftime("%H:%M")
-                    response = f"Agora são {current_time}."
-                elif any(keyword in user_input_lower for keyword in DATE_QUERY_KEYWORDS):
-                    now = datetime.datetime.now()
-                    current_date = now.strftime("%d de %B de %Y")
-                    response = f"Hoje é {current_date}."
-
-                # Consulta sobre previsão do tempo
-                elif any(keyword in user_input_lower for keyword in WEATHER_QUERY_KEYWORDS):
-                    response = self.get_weather_forecast()
-
-                # Comando para tocar música
-
-                    # Comando para tocar música
-                elif any(keyword in user_input_lower for keyword in PLAY_MUSIC_COMMANDS):
-                    # Extrair nome da música do input do usuário
-                    for keyword in PLAY_MUSIC_COMMANDS:
-                        if keyword in user_input_lower:
-                            song_name = user_input_lower.partition(keyword)[2].strip()
-                            break
-                    else:
-                        song_name = ''
-                    if song_name:
-                        response = self.play_music(song_name)
-                    else:
-                        response = "Por favor, diga o nome da música que deseja ouvir."
-
-                # Comando para parar música
-                elif any(keyword in user_input_lower for keyword in STOP_MUSIC_COMMANDS):
-                    response = self.stop_music()
-
-                else:
-                    # Obter resposta da IA usando ChatGPT
-                    assistant_response = self.chatgpt.get_response(user_input, self.context)
-                    response = assistant_response
-                    # Adicionar a conversa ao contexto
-                    self.context.append({'role': 'user', 'content': user_input})
-                    self.context.append({'role': 'assistant', 'content': response})
-
-                self.update_conversation_label(f"Assistente: {response}")
-
-                # Desativar a escuta enquanto a IA fala
-                self.voice_assistant.stop_listening()
-                self.voice_assistant.speak(response)
-                if not self.is_listening:
-                    break  # Sai do loop se is_listening for False
-                self.voice_assistant.start_listening()
-
-            except Exception as e:
-                print(f"Erro no fluxo de conversa: {e}")
-                traceback.print_exc()
-                self.update_conversation_label("Desculpe, ocorreu um erro ao processar sua solicitação.")
-                self.is_listening = False
-                self.voice_assistant.stop_listening()
-                break
-
-    def get_weather_forecast(self):
-        try:
-            api_key = utils.get_setting("weatherapi_api_key", "")
-            if not api_key:
-                return "API Key da WeatherAPI.com não configurada. Por favor, configure sua API Key nas configurações."
-            city = utils.get_setting("city_name", "São Paulo")  # Cidade padrão
-            url = f"http://api.weatherapi.com/v1/forecast.json?key={api_key}&q={city}&lang=pt&days=1"
-            response = requests.get(url)
-            data = response.json()
-
-            if 'error' in data:
-                return "Desculpe, não consegui obter a previsão do tempo no momento."
-
-            forecast = data['forecast']['forecastday'][0]
-            day = forecast['day']
-            condition = day['condition']['text']
-            chance_of_rain = day.get('daily_chance_of_rain', 0)
-
-            response = f"A previsão para hoje em {city} é de {condition.lower()}."
-            if int(chance_of_rain) > 0:
-                response += f" Há {chance_of_rain}% de chance de chuva."
-            else:
-                response += " Não há previsão de chuva."
-            return response
-        except Exception as e:
-            print(f"Erro ao obter a previsão do tempo: {e}")
-            traceback.print_exc()
-            return "Desculpe, não consegui obter a previsão do tempo."
-
-
-    def play_music(self, song_name):
-        try:
-            # Pesquisar no YouTube
-            search_query = song_name.replace(' ', '+')
-            url = f"https://www.youtube.com/results?search_query={search_query}"
-            html = requests.get(url).text
-            video_ids = re.findall(r"watch\?v=(\S{11})", html)
-            if not video_ids:
-                return "Desculpe, não consegui encontrar a música solicitada."
-
-            video_url = f"https://www.youtube.com/watch?v={video_ids[0]}"
-
-            # Usar o yt_dlp para obter o URL de streaming
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'quiet': True,
-                'no_warnings': True,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info_dict = ydl.extract_info(video_url, download=False)
-                audio_url = info_dict['url']
-                title = info_dict.get('title', 'música')
-
-            # Parar qualquer música que esteja tocando
-            if hasattr(self, 'media_player') and self.media_player is not None:
-                self.media_player.stop()
-
-            self.instance = vlc.Instance()
-            self.media_player = self.instance.media_player_new()
-            media = self.instance.media_new(audio_url)
-            media.get_mrl()
-            self.media_player.set_media(media)
-            self.media_player.play()
-
-            self.music_mode = True  # Ativar o modo música
-            return f"Iniciando a reprodução de {title}."
-        except Exception as e:
-            print(f"Erro ao reproduzir música: {e}")
-            traceback.print_exc()
-            return "Desculpe, ocorreu um erro ao tentar reproduzir a música."
-
-    def stop_music(self):
-        try:
-            if hasattr(self, 'media_player') and self.media_player is not None:
-                self.media_player.stop()
-                self.media_player = None
-                self.music_mode = False  # Desativar o modo música
-                return "Música interrompida."
-            else:
-                return "Nenhuma música está sendo reproduzida no momento."
-        except Exception as e:
-            print(f"Erro ao parar música: {e}")
-            traceback.print_exc()
-            return "Desculpe, ocorreu um erro ao tentar parar a música."
+        elif event == "partial_transcript":
+            self.update_conversation_label(f"Você: {data['text']}...")
+        elif event == "transcript":
+            self.update_conversation_label(f"Você: {data['text']}")
+        elif event == "not_understood":
+            self.update_conversation_label("Não entendi. Por favor, tente novamente.")
+        elif event in ("response_partial", "response"):
+            self.update_conversation_label(f"Assistente: {data['text']}")
+        elif event == "error":
+            self.update_conversation_label(data['message'])
+        elif event == "stopped":
+            self.is_listening = False
+            self.start_button.setText("Iniciar Conversa")
 
     def update_conversation_label(self, text):
         self.conversation_label.setText(text)
@@ -436,7 +187,7 @@ class SettingsWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Configurações")
-        self.setFixedSize(400, 400)
+        self.setFixedSize(400, 660)
         self.setup_ui()
 
     def setup_ui(self):
@@ -497,6 +248,32 @@ class SettingsWindow(QMainWindow):
         self.layout.addWidget(self.mic_label)
         self.layout.addWidget(self.mic_selector)
 
+        # Seleção do motor de reconhecimento de fala
+        self.stt_label = QLabel("Reconhecimento de Fala:")
+        self.stt_selector = QComboBox()
+        for engine_name, engine_label in get_stt_backend_list():
+            self.stt_selector.addItem(engine_label, engine_name)
+        current_engine = utils.get_setting("stt_engine", "google")
+        for i in range(self.stt_selector.count()):
+            if self.stt_selector.itemData(i) == current_engine:
+                self.stt_selector.setCurrentIndex(i)
+                break
+        self.layout.addWidget(self.stt_label)
+        self.layout.addWidget(self.stt_selector)
+
+        # O que fazer quando o usuário fala enquanto o assistente responde
+        self.overlap_label = QLabel("Fala durante a resposta:")
+        self.overlap_selector = QComboBox()
+        for policy, policy_label in [("queue", "Responder em seguida"), ("drop", "Ignorar"), ("interrupt", "Interromper a resposta")]:
+            self.overlap_selector.addItem(policy_label, policy)
+        current_policy = utils.get_setting("overlap_policy", "queue")
+        for i in range(self.overlap_selector.count()):
+            if self.overlap_selector.itemData(i) == current_policy:
+                self.overlap_selector.setCurrentIndex(i)
+                break
+        self.layout.addWidget(self.overlap_label)
+        self.layout.addWidget(self.overlap_selector)
+
         # Seleção de Webcam
         self.cam_label = QLabel("Webcam:")
         self.cam_selector = QComboBox()
@@ -523,6 +300,33 @@ class SettingsWindow(QMainWindow):
         self.layout.addWidget(self.backend_label)
         self.layout.addWidget(self.backend_selector)
 
+        # Perfil de captura (resolução, FPS, formato), salvo por câmera, com a latência medida
+        self.profile_label = QLabel("Perfil de Captura:")
+        self.profile_selector = QComboBox()
+        self.measure_button = QPushButton("Medir Latência dos Perfis")
+        self.measure_button.clicked.connect(self.measure_capture_profiles)
+        self.capture_signals = CaptureSignals()
+        self.capture_signals.measured.connect(self.on_profiles_measured, Qt.QueuedConnection)
+        self.capture_signals.profile_applied.connect(self.on_profile_applied, Qt.QueuedConnection)
+        self.cam_selector.currentIndexChanged.connect(self.load_capture_profiles)
+        self.load_capture_profiles()
+        self.layout.addWidget(self.profile_label)
+        self.layout.addWidget(self.profile_selector)
+        self.layout.addWidget(self.measure_button)
+
+        # Seleção do backend de detecção de objetos
+        self.detection_label = QLabel("Detecção de Objetos:")
+        self.detection_selector = QComboBox()
+        for backend_name, backend_label in get_detection_backend_list():
+            self.detection_selector.addItem(backend_label, backend_name)
+        current_detection = utils.get_setting("detection_backend", "pytorch")
+        for i in range(self.detection_selector.count()):
+            if self.detection_selector.itemData(i) == current_detection:
+                self.detection_selector.setCurrentIndex(i)
+                break
+        self.layout.addWidget(self.detection_label)
+        self.layout.addWidget(self.detection_selector)
+
         # Botão Salvar
         self.save_button = QPushButton("Salvar Configurações")
         self.save_button.clicked.connect(self.save_settings)
@@ -531,6 +335,62 @@ class SettingsWindow(QMainWindow):
         self.central_widget.setLayout(self.layout)
         self.setCentralWidget(self.central_widget)
 
+    def load_capture_profiles(self):
+        """Preenche os perfis da câmera selecionada, com as medições salvas."""
+        camera_index = self.cam_selector.currentIndex()
+        measurements = camera_profiles.get_profile_measurements(camera_index)
+        self.profile_selector.clear()
+        for profile_name, profile_label in camera_profiles.get_capture_profile_list():
+            measurement = measurements.get(profile_name)
+            if measurement:
+                accepted = measurement["accepted"]
+                profile_label += (f" — {measurement['latency_ms']:.0f} ms, {measurement['fps']:.0f} FPS"
+                                  f" ({accepted['width']}x{accepted['height']} {accepted['fourcc']})")
+            self.profile_selector.addItem(profile_label, profile_name)
+        current_profile = camera_profiles.get_camera_profile(camera_index)
+        for i in range(self.profile_selector.count()):
+            if self.profile_selector.itemData(i) == current_profile:
+                self.profile_selector.setCurrentIndex(i)
+                break
+
+    def active_vision_assistant(self):
+        """Assistente de visão da janela principal, se estiver usando a câmera selecionada."""
+        vision = getattr(self.parent(), 'vision_assistant', None)
+        if vision is None or not vision.camera_available or vision.camera_index != self.cam_selector.currentIndex():
+            return None
+        return vision
+
+    def measure_capture_profiles(self):
+        vision = self.active_vision_assistant()
+        if vision is None:
+            QMessageBox.information(self, "Perfis de Captura",
+                                    "Salve e reinicie o aplicativo com esta câmera para medir os perfis.")
+            return
+        # A medição leva vários segundos de leitura da câmera: roda fora da thread da interface
+        self.measure_button.setEnabled(False)
+        self.measure_button.setText("Medindo perfis...")
+        # Salvar agora esperaria a medição liberar a câmera
+        self.save_button.setEnabled(False)
+
+        def worker():
+            try:
+                results = vision.measure_capture_profiles()
+            except Exception as e:
+                print(f"Erro ao medir os perfis de captura: {e}")
+                traceback.print_exc()
+                results = None
+            self.capture_signals.measured.emit(results)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_profiles_measured(self, results):
+        self.measure_button.setEnabled(True)
+        self.measure_button.setText("Medir Latência dos Perfis")
+        self.save_button.setEnabled(True)
+        if not results:
+            QMessageBox.critical(self, "Erro", "Não foi possível medir os perfis de captura.")
+        self.load_capture_profiles()
+
     def save_settings(self):
         try:
             utils.set_setting("openai_api_key", self.api_key_input.text())
@@ -539,8 +399,18 @@ class SettingsWindow(QMainWindow):
             utils.set_setting("city_name", self.city_input.text())
             chosen_mic_index = self.mic_selector.itemData(self.mic_selector.currentIndex())
             utils.set_setting("microphone_index", chosen_mic_index)
+            utils.set_setting("stt_engine", self.stt_selector.itemData(self.stt_selector.currentIndex()))
+            utils.set_setting("overlap_policy", self.overlap_selector.itemData(self.overlap_selector.currentIndex()))
             utils.set_setting("camera_index", self.cam_selector.currentIndex())
             utils.set_setting("camera_backend", self.backend_selector.currentText())
+            utils.set_setting("detection_backend", self.detection_selector.itemData(self.detection_selector.currentIndex()))
+            chosen_profile = self.profile_selector.itemData(self.profile_selector.currentIndex())
+            camera_profiles.set_camera_profile(self.cam_selector.currentIndex(), chosen_profile)
+            # Aplica já na câmera em uso: a captura é parada, reconfigurada e reiniciada
+            vision = self.active_vision_assistant()
+            if vision is not None and chosen_profile != vision.capture_profile:
+                self.apply_capture_profile(vision, chosen_profile)
+                return
 
             QMessageBox.information(self, "Configurações Salvas", "As configurações foram salvas com sucesso.")
             self.close()
@@ -549,6 +419,34 @@ class SettingsWindow(QMainWindow):
             traceback.print_exc()
             QMessageBox.critical(self, "Erro", "Ocorreu um erro ao salvar as configurações.")
 
+    def apply_capture_profile(self, vision, profile):
+        # Parar a captura e reabrir a câmera leva alguns segundos: roda fora da thread da interface
+        self.save_button.setEnabled(False)
+        self.save_button.setText("Aplicando perfil...")
+        self.measure_button.setEnabled(False)
+
+        def worker():
+            try:
+                applied = vision.set_capture_profile(profile)
+            except Exception as e:
+                print(f"Erro ao aplicar o perfil de captura: {e}")
+                traceback.print_exc()
+                applied = False
+            self.capture_signals.profile_applied.emit(bool(applied))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_profile_applied(self, applied):
+        self.save_button.setEnabled(True)
+        self.save_button.setText("Salvar Configurações")
+        self.measure_button.setEnabled(True)
+        if not applied:
+            QMessageBox.warning(self, "Configurações Salvas",
+                                "As configurações foram salvas, mas a câmera não abriu com o novo perfil.")
+            return
+        QMessageBox.information(self, "Configurações Salvas", "As configurações foram salvas com sucesso.")
+        self.close()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -0,0 +1,157 @@
+# http_client.py
+import time
+import random
+import threading
+import contextlib
+import logging
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Timeouts por serviço: (conexão, leitura) em segundos
+SERVICE_TIMEOUTS = {
+    "openai": (5, 60),
+    "elevenlabs": (5, 30),
+    "weather": (3, 5),
+    "youtube": (3, 8),
+}
+DEFAULT_TIMEOUT = (5, 15)
+
+# Status que valem uma nova tentativa
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """O serviço falhou várias vezes seguidas e está temporariamente bloqueado."""
+
+
+class CircuitBreaker:
+    """Bloqueia chamadas a um serviço depois de falhas seguidas, testando de novo após um tempo."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            # Meio aberto: deixa passar uma tentativa depois do tempo de espera
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.warning(f"Circuito aberto para o serviço {self.name}")
+                self.opened_at = time.monotonic()
+
+
+_lock = threading.Lock()
+_session = None
+_httpx_clients = {}
+_breakers = {}
+
+
+def get_timeout(service):
+    return SERVICE_TIMEOUTS.get(service, DEFAULT_TIMEOUT)
+
+
+def get_breaker(service):
+    with _lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+
+def get_session():
+    """Sessão requests compartilhada, com pool de conexões e keep-alive."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def get_httpx_timeout(service):
+    connect_timeout, read_timeout = get_timeout(service)
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def get_httpx_client(service):
+    """Cliente httpx compartilhado por serviço (usado pelos SDKs do OpenAI e do ElevenLabs)."""
+    with _lock:
+        if service not in _httpx_clients:
+            _httpx_clients[service] = httpx.Client(
+                timeout=get_httpx_timeout(service),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60),
+                transport=httpx.HTTPTransport(retries=2)
+            )
+        return _httpx_clients[service]
+
+
+def backoff_delay(attempt, base=0.3, maximum=4.0):
+    """Espera exponencial com jitter completo."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+@contextlib.contextmanager
+def guarded(service):
+    """Registra sucesso ou falha de uma chamada no circuit breaker do serviço."""
+    breaker = get_breaker(service)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Serviço {service} temporariamente indisponível")
+    try:
+        yield
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+
+def request(service, method, url, retries=2, **kwargs):
+    """Faz uma requisição pela sessão compartilhada com timeout, novas tentativas e circuit breaker."""
+    breaker = get_breaker(service)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Serviço {service} temporariamente indisponível")
+
+    kwargs.setdefault('timeout', get_timeout(service))
+    session = get_session()
+    for attempt in range(retries + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+            if response.status_code in RETRY_STATUS and attempt < retries:
+                logging.warning(f"{service}: status {response.status_code}, tentando novamente")
+                time.sleep(backoff_delay(attempt))
+                continue
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record_failure()
+            if attempt >= retries or not breaker.allow():
+                raise
+            logging.warning(f"{service}: {e}, tentando novamente")
+            time.sleep(backoff_delay(attempt))
+
+
+def get(service, url, **kwargs):
+    return request(service, 'GET', url, **kwargs)
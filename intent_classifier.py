@@ -0,0 +1,133 @@
+# intent_classifier.py
+import difflib
+import numpy as np
+import utils
+from intents import IntentMatch
+from response_cache import normalize_message
+
+
+# Palavras sem conteúdo (já normalizadas): sozinhas não bastam para reconhecer uma intenção
+STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "de", "do", "da", "dos", "das", "em", "no", "na", "nos", "nas",
+    "e", "que", "qual", "quais", "quem", "como", "quando", "onde", "eu", "voce", "seu", "sua", "seus",
+    "suas", "meu", "minha", "meus", "minhas", "me", "te", "se", "por", "para", "pra", "com", "sobre",
+    "isso", "isto", "esse", "essa", "este", "esta", "ao", "aos", "ou", "mais", "muito", "ja", "nao",
+    "sim", "sao", "estou", "tem", "ter", "ser", "algo", "mim", "ti",
+}
+
+
+def content_words(text):
+    return [word for word in normalize_message(text).split() if word not in STOPWORDS]
+
+
+def char_ngrams(text, min_n=2, max_n=4):
+    """N-gramas de caracteres de cada palavra, com espaço nas bordas (ex.: ' ho', 'hor', 'ora')."""
+    ngrams = []
+    for word in normalize_message(text).split():
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            ngrams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return ngrams
+
+
+class IntentClassifier:
+    """Classificador aproximado de intenções por TF-IDF de n-gramas de caracteres.
+
+    Os vetores dos exemplos (as palavras-chave do registro) são calculados uma
+    única vez; cada frase é pontuada com um só produto matriz-vetor. Serve para
+    transcrições que erram a frase exata por uma palavra ou acento.
+    """
+
+    def __init__(self, registry, threshold=None, min_n=2, max_n=4):
+        self.registry = registry
+        self.min_n = min_n
+        self.max_n = max_n
+        if threshold is None:
+            threshold = utils.get_setting("intent_threshold", 0.7)
+        self.threshold = float(threshold)
+        self.fit()
+
+    def fit(self):
+        """Monta o vocabulário, o IDF e a matriz normalizada dos exemplos."""
+        self.examples = []
+        self.example_words = []
+        self.vocabulary = {}
+        rows = []
+        for intent in self.registry.intents:
+            for keyword in intent.keywords:
+                ngrams = char_ngrams(keyword, self.min_n, self.max_n)
+                if not ngrams:
+                    continue
+                for ngram in ngrams:
+                    self.vocabulary.setdefault(ngram, len(self.vocabulary))
+                self.examples.append((intent, keyword))
+                self.example_words.append(content_words(keyword))
+                rows.append(ngrams)
+
+        counts = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        for row, ngrams in enumerate(rows):
+            for ngram in ngrams:
+                counts[row, self.vocabulary[ngram]] += 1
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.matrix = self._normalize(counts * self.idf)
+
+    @staticmethod
+    def _normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def vectorize(self, text):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for ngram in char_ngrams(text, self.min_n, self.max_n):
+            index = self.vocabulary.get(ngram)
+            if index is not None:
+                vector[index] += 1
+        return self._normalize(vector * self.idf)
+
+    def scores(self, text):
+        """Similaridade de cosseno da frase com cada exemplo."""
+        if not self.examples:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.vectorize(text)
+
+    @staticmethod
+    def covers(words, example_words, similarity=0.75):
+        """Cada palavra de conteúdo do exemplo aparece na frase, admitindo erros de transcrição.
+
+        Exemplos só com palavras comuns ("o que é isso") não têm o que conferir:
+        a pontuação decide sozinha.
+        """
+        if not example_words:
+            return True
+        return all(
+            any(difflib.SequenceMatcher(None, word, example_word).ratio() >= similarity for word in words)
+            for example_word in example_words
+        )
+
+    def classify(self, text, candidates=5):
+        """Retorna o IntentMatch do exemplo mais parecido, com a pontuação, mesmo abaixo do limiar.
+
+        Só valem exemplos cujas palavras de conteúdo estão na frase: "qual é o
+        seu time" lembra "qual é o seu nome" nas palavras comuns, mas não é a
+        mesma pergunta.
+        """
+        scores = self.scores(text)
+        if not len(scores):
+            return None
+        words = content_words(text)
+        for index in np.argsort(scores)[::-1][:candidates]:
+            if not self.covers(words, self.example_words[index]):
+                continue
+            intent, keyword = self.examples[index]
+            return IntentMatch(intent, keyword, {intent.name: keyword}, score=float(scores[index]))
+        return None
+
+    def match(self, text):
+        """Retorna o IntentMatch quando a pontuação passa do limiar; senão None."""
+        candidate = self.classify(text)
+        if candidate is None or candidate.score < self.threshold:
+            return None
+        return candidate
@@ -0,0 +1,126 @@
+# intents.py
+from collections import deque
+
+
+class IntentMatch:
+    """Resultado do reconhecimento: a intenção vencedora e todas as que apareceram no texto."""
+
+    def __init__(self, intent, keyword, matched, score=1.0):
+        self.intent = intent
+        self.name = intent.name
+        self.handler = intent.handler
+        self.keyword = keyword
+        # nome da intenção -> primeira palavra-chave dela (na ordem de registro) presente no texto
+        self.matched = matched
+        # 1.0 para correspondência exata; a similaridade quando vem do classificador aproximado
+        self.score = score
+
+    def has(self, name):
+        return name in self.matched
+
+
+class Intent:
+    def __init__(self, name, keywords, handler, priority):
+        self.name = name
+        self.keywords = list(keywords)
+        self.handler = handler
+        self.priority = priority
+
+
+class IntentRegistry:
+    """Registro declarativo de intenções compilado em um único autômato Aho-Corasick.
+
+    Todas as palavras-chave são encontradas em uma só passada pelo texto. Em
+    caso de várias intenções, vence a de menor prioridade (por padrão, a ordem
+    de registro), igual à antiga cadeia de if/elif.
+    """
+
+    def __init__(self):
+        self.intents = []
+        self.by_name = {}
+        self._automaton = None
+
+    def register(self, name, keywords, handler=None, priority=None):
+        """Registra (ou substitui) uma intenção com suas palavras-chave."""
+        if priority is None:
+            priority = self.by_name[name].priority if name in self.by_name else len(self.intents)
+        intent = Intent(name, [keyword.lower() for keyword in keywords], handler, priority)
+        if name in self.by_name:
+            self.intents[self.intents.index(self.by_name[name])] = intent
+        else:
+            self.intents.append(intent)
+        self.by_name[name] = intent
+        self._automaton = None
+        return intent
+
+    def unregister(self, name):
+        intent = self.by_name.pop(name, None)
+        if intent is not None:
+            self.intents.remove(intent)
+            self._automaton = None
+
+    def compile(self):
+        """Monta o autômato (trie com links de falha) com as palavras-chave de todas as intenções."""
+        goto = [{}]
+        outputs = [[]]
+        for intent_index, intent in enumerate(self.intents):
+            for keyword_index, keyword in enumerate(intent.keywords):
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append((intent_index, keyword_index))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._automaton = (goto, fail, outputs)
+        return self._automaton
+
+    def _scan(self, text):
+        """Percorre o texto uma vez e retorna {índice da intenção: menor índice de palavra-chave}."""
+        goto, fail, outputs = self._automaton or self.compile()
+        found = {}
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for intent_index, keyword_index in outputs[state]:
+                if keyword_index < found.get(intent_index, len(self.intents[intent_index].keywords)):
+                    found[intent_index] = keyword_index
+        return found
+
+    def match(self, text):
+        """Retorna o IntentMatch da intenção de maior prioridade presente no texto, ou None."""
+        found = self._scan(text.lower())
+        if not found:
+            return None
+        matched = {
+            self.intents[intent_index].name: self.intents[intent_index].keywords[keyword_index]
+            for intent_index, keyword_index in found.items()
+        }
+        best_index = min(found, key=lambda index: (self.intents[index].priority, index))
+        best = self.intents[best_index]
+        return IntentMatch(best, matched[best.name], matched)
+
+    def matches(self, text):
+        """Retorna {nome da intenção: palavra-chave} de todas as intenções presentes no texto."""
+        match = self.match(text)
+        return match.matched if match else {}
@@ -0,0 +1,87 @@
+# logging_setup.py
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+import utils
+
+LOG_FILE = 'voice_assistant.log'
+
+# Bibliotecas de HTTP ficam silenciosas por padrão
+DEFAULT_LOGGER_LEVELS = {
+    "httpx": "WARNING",
+    "httpcore": "WARNING",
+    "urllib3": "WARNING",
+    "openai": "WARNING",
+    "elevenlabs": "WARNING",
+}
+
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON, para análise automática."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "created": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging():
+    """Configura o logging com escrita em um thread separado, rotação de arquivo e níveis por logger."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = utils.get_setting("log_level", "INFO")
+    logger_levels = dict(DEFAULT_LOGGER_LEVELS)
+    logger_levels.update(utils.get_setting("log_levels", {}) or {})
+
+    if utils.get_setting("log_format", "text") == "json":
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        utils.get_setting("log_file", LOG_FILE),
+        maxBytes=int(utils.get_setting("log_max_bytes", 1024 * 1024)),
+        backupCount=int(utils.get_setting("log_backup_count", 3)),
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # O thread que chama o log só enfileira o registro; a escrita acontece no listener
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, logger_level in logger_levels.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Esvazia a fila de logs e encerra o thread de escrita."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
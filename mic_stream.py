@@ -0,0 +1,232 @@
+# mic_stream.py
+import time
+import queue
+import threading
+import logging
+import collections
+import numpy as np
+import sounddevice as sd
+import speech_recognition as sr
+import utils
+
+
+class MicrophoneStream:
+    """Mantém o microfone aberto e separa as falas em um thread de fundo."""
+
+    def __init__(self, device_index=None, sample_rate=16000, frame_ms=30, preroll_ms=300,
+                 pause_ms=800, phrase_time_limit=10, calibration_ms=500):
+        self.device_index = int(device_index) if device_index is not None else None
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.pause_frames = max(1, int(pause_ms / frame_ms))
+        self.max_frames = int(phrase_time_limit * 1000 / frame_ms)
+        self.calibration_frames = max(1, int(calibration_ms / frame_ms))
+
+        # Buffer circular com o áudio recente, usado como pré-roll de cada fala
+        self.preroll = collections.deque(maxlen=max(1, int(preroll_ms / frame_ms)))
+        self.frames = queue.Queue(maxsize=int(5000 / frame_ms))
+        self.utterances = queue.Queue(maxsize=8)
+
+        self.stream = None
+        self.thread = None
+        self.running = threading.Event()
+        self.paused = threading.Event()
+        self.in_speech = threading.Event()
+        self.reset_requested = threading.Event()
+
+        # Ouvintes que recebem os quadros de cada fala enquanto ela acontece
+        self.frame_listeners = []
+        self.utterance_id = 0
+
+        # Calibração de ruído salva por índice de microfone
+        self.energy_threshold = self._load_calibration()
+        self.calibrated = self.energy_threshold is not None
+        if self.energy_threshold is None:
+            self.energy_threshold = 3000
+        self.ambient_energy = None
+
+    def _calibration_key(self):
+        return str(self.device_index)
+
+    def _load_calibration(self):
+        calibrations = utils.get_setting("noise_calibration", {}) or {}
+        value = calibrations.get(self._calibration_key())
+        if value is not None:
+            logging.info(f"Calibração de ruído reaproveitada para o microfone {self.device_index}: {value:.0f}")
+        return value
+
+    def _save_calibration(self):
+        key, threshold = self._calibration_key(), round(self.energy_threshold, 1)
+
+        def update(calibrations):
+            calibrations = dict(calibrations or {})
+            calibrations[key] = threshold
+            return calibrations
+
+        utils.update_setting("noise_calibration", update, {})
+
+    def start(self):
+        """Abre o stream de captura e inicia o thread de segmentação."""
+        if self.running.is_set():
+            return
+        self.stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.frame_samples,
+            channels=1,
+            dtype='int16',
+            device=self.device_index,
+            callback=self._on_audio
+        )
+        self.running.set()
+        self.stream.start()
+        self.thread = threading.Thread(target=self._segment_loop, daemon=True)
+        self.thread.start()
+        logging.info(f"Captura contínua iniciada no microfone {self.device_index}")
+
+    def close(self):
+        self.running.clear()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def _on_audio(self, indata, frames, time_info, status):
+        if status:
+            logging.debug(f"Status da captura: {status}")
+        try:
+            self.frames.put_nowait(bytes(indata))
+        except queue.Full:
+            # Descarta o quadro mais antigo para não travar o callback de áudio
+            try:
+                self.frames.get_nowait()
+                self.frames.put_nowait(bytes(indata))
+            except (queue.Empty, queue.Full):
+                pass
+
+    @staticmethod
+    def _energy(frame):
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+    def _update_ambient(self, energy):
+        """Acompanha o ruído de fundo e ajusta o limiar de energia."""
+        if self.ambient_energy is None:
+            self.ambient_energy = energy
+        else:
+            self.ambient_energy = 0.95 * self.ambient_energy + 0.05 * energy
+        self.energy_threshold = max(300.0, self.ambient_energy * 1.5)
+
+    def _segment_loop(self):
+        speech = []
+        silent_frames = 0
+        calibration_energies = []
+
+        while self.running.is_set():
+            try:
+                frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if self.paused.is_set() or self.reset_requested.is_set():
+                self.reset_requested.clear()
+                speech = []
+                silent_frames = 0
+                self.in_speech.clear()
+                self.preroll.clear()
+                continue
+
+            energy = self._energy(frame)
+
+            # Calibração em segundo plano, sem atrasar a primeira escuta
+            if not self.calibrated:
+                calibration_energies.append(energy)
+                if len(calibration_energies) >= self.calibration_frames:
+                    self.ambient_energy = float(np.mean(calibration_energies))
+                    self.energy_threshold = max(300.0, self.ambient_energy * 1.5)
+                    self.calibrated = True
+                    self._save_calibration()
+                    logging.info(f"Calibração de ruído concluída: limiar {self.energy_threshold:.0f}")
+
+            if not speech:
+                if energy > self.energy_threshold:
+                    speech = list(self.preroll)
+                    speech.append(frame)
+                    silent_frames = 0
+                    self.utterance_id += 1
+                    self.in_speech.set()
+                    self._notify_listeners(b''.join(speech), started=True)
+                else:
+                    self.preroll.append(frame)
+                    self._update_ambient(energy)
+                continue
+
+            speech.append(frame)
+            self._notify_listeners(frame)
+            silent_frames = silent_frames + 1 if energy <= self.energy_threshold else 0
+            if silent_frames >= self.pause_frames or len(speech) >= self.max_frames:
+                self._emit(speech)
+                speech = []
+                silent_frames = 0
+                self.preroll.clear()
+                self.in_speech.clear()
+
+    def _notify_listeners(self, pcm, started=False):
+        for frame_listener in list(self.frame_listeners):
+            try:
+                frame_listener(self.utterance_id, pcm, started)
+            except Exception as e:
+                logging.error(f"Erro no ouvinte de áudio: {e}")
+
+    def add_frame_listener(self, frame_listener):
+        """Registra uma função chamada com (utterance_id, pcm, started) durante cada fala.
+
+        started é True só no primeiro bloco da fala (com o pré-roll).
+        """
+        self.frame_listeners.append(frame_listener)
+
+    def remove_frame_listener(self, frame_listener):
+        if frame_listener in self.frame_listeners:
+            self.frame_listeners.remove(frame_listener)
+
+    def _emit(self, speech):
+        audio = sr.AudioData(b''.join(speech), self.sample_rate, 2)
+        audio.utterance_id = self.utterance_id
+        try:
+            self.utterances.put_nowait(audio)
+        except queue.Full:
+            logging.warning("Fila de falas cheia, descartando a mais antiga")
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(audio)
+
+    def next_utterance(self, timeout=5, should_continue=None):
+        """Retorna a próxima fala capturada como AudioData, ou None em caso de timeout."""
+        deadline = time.monotonic() + timeout
+        while should_continue is None or should_continue():
+            try:
+                return self.utterances.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            # O timeout só vale enquanto ninguém começou a falar
+            if time.monotonic() > deadline and not self.in_speech.is_set():
+                return None
+        return None
+
+    def pause(self):
+        """Ignora o áudio capturado (ex.: enquanto o assistente fala)."""
+        self.paused.set()
+
+    def resume(self):
+        """Volta a segmentar falas, descartando o que foi capturado durante a pausa."""
+        self.clear()
+        self.paused.clear()
+
+    def clear(self):
+        self.reset_requested.set()
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                break
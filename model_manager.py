@@ -0,0 +1,211 @@
+# model_manager.py
+import gc
+import os
+import time
+import threading
+import contextlib
+import traceback
+import utils
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def resident_memory():
+    """Memória residente do processo em bytes (None se não der para medir)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        # Linux sem psutil
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ManagedModel:
+    def __init__(self, name, loader, warmup=None, unloader=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.unloader = unloader
+        self.model = None
+        self.load_time = None
+        self.warmup_time = None
+        self.memory = None
+        self.loads = 0
+        self.last_used = None
+        self.in_use = 0
+        self.lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+
+class ModelManager:
+    """Carrega cada modelo uma única vez, sob demanda, e libera os que ficam ociosos.
+
+    O pré-aquecimento roda uma inferência de teste em segundo plano para a
+    primeira pergunta não pagar o carregamento. Com um orçamento de memória,
+    os modelos usados há mais tempo são descarregados primeiro.
+    """
+
+    def __init__(self, memory_budget_mb=None, idle_timeout=None):
+        if memory_budget_mb is None:
+            memory_budget_mb = utils.get_setting("model_memory_budget_mb", 0)
+        if idle_timeout is None:
+            idle_timeout = utils.get_setting("model_idle_unload_seconds", 900)
+        self.memory_budget = int(memory_budget_mb) * 1024 * 1024  # 0 = sem limite
+        self.idle_timeout = idle_timeout  # 0 = nunca descarregar
+        self.models = {}
+        self.lock = threading.Lock()
+        self.idle_thread = None
+
+    def register(self, name, loader, warmup=None, unloader=None):
+        """Registra um modelo; loader() o carrega e warmup(modelo) faz uma inferência de teste."""
+        with self.lock:
+            if name not in self.models:
+                self.models[name] = ManagedModel(name, loader, warmup, unloader)
+            return self.models[name]
+
+    def get(self, name):
+        """Retorna o modelo, carregando-o (e aquecendo) se necessário."""
+        entry = self.models[name]
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.last_used = time.monotonic()
+            model = entry.model
+        self._enforce_budget(keep=name)
+        return model
+
+    @contextlib.contextmanager
+    def use(self, name):
+        """Usa o modelo sem risco de ele ser descarregado no meio da inferência."""
+        entry = self.models[name]
+        with entry.lock:
+            entry.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def _load(self, entry):
+        memory_before = resident_memory()
+        started = time.perf_counter()
+        entry.model = entry.loader()
+        entry.load_time = time.perf_counter() - started
+        entry.loads += 1
+        if entry.warmup is not None:
+            started = time.perf_counter()
+            try:
+                entry.warmup(entry.model)
+            except Exception as e:
+                print(f"Erro no pré-aquecimento do modelo {entry.name}: {e}")
+                traceback.print_exc()
+            entry.warmup_time = time.perf_counter() - started
+        memory_after = resident_memory()
+        if memory_before is not None and memory_after is not None:
+            entry.memory = max(0, memory_after - memory_before)
+        print(f"Modelo {entry.name} carregado em {entry.load_time:.2f} s"
+              + (f", aquecido em {entry.warmup_time:.2f} s" if entry.warmup_time is not None else ""))
+        self._start_idle_monitor()
+
+    def unload(self, name):
+        entry = self.models[name]
+        with entry.lock:
+            if entry.model is None or entry.in_use:
+                return False
+            model, entry.model = entry.model, None
+            if entry.unloader is not None:
+                try:
+                    entry.unloader(model)
+                except Exception as e:
+                    print(f"Erro ao descarregar o modelo {name}: {e}")
+            del model
+        gc.collect()
+        print(f"Modelo {name} descarregado")
+        return True
+
+    def warm_up(self, names=None, background=True):
+        """Carrega e aquece os modelos indicados (todos, por padrão)."""
+        names = list(names or self.models)
+
+        def worker():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Erro ao carregar o modelo {name}: {e}")
+                    traceback.print_exc()
+
+        if not background:
+            worker()
+            return None
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def _enforce_budget(self, keep=None):
+        """Descarrega os modelos usados há mais tempo enquanto o total passar do orçamento."""
+        if not self.memory_budget:
+            return
+        loaded = [entry for entry in self.models.values() if entry.loaded]
+        total = sum(entry.memory or 0 for entry in loaded)
+        for entry in sorted(loaded, key=lambda entry: entry.last_used or 0):
+            if total <= self.memory_budget:
+                break
+            if entry.name != keep and self.unload(entry.name):
+                total -= entry.memory or 0
+
+    def _start_idle_monitor(self):
+        with self.lock:
+            if not self.idle_timeout or (self.idle_thread is not None and self.idle_thread.is_alive()):
+                return
+            self.idle_thread = threading.Thread(target=self._idle_loop, daemon=True)
+            self.idle_thread.start()
+
+    def _idle_loop(self):
+        interval = max(1, min(60, self.idle_timeout / 2))
+        while any(entry.loaded for entry in self.models.values()):
+            time.sleep(interval)
+            now = time.monotonic()
+            for entry in list(self.models.values()):
+                if entry.loaded and not entry.in_use and now - (entry.last_used or now) > self.idle_timeout:
+                    self.unload(entry.name)
+
+    def busy(self):
+        """Indica se algum modelo está em uso (inferência em andamento)."""
+        return any(entry.in_use for entry in self.models.values())
+
+    def stats(self):
+        """Tempo de carga, tempo de aquecimento e memória residente de cada modelo."""
+        return {
+            name: {
+                "loaded": entry.loaded,
+                "loads": entry.loads,
+                "load_time": entry.load_time,
+                "warmup_time": entry.warmup_time,
+                "memory_mb": entry.memory / (1024 * 1024) if entry.memory is not None else None,
+                "idle_seconds": time.monotonic() - entry.last_used if entry.last_used else None,
+            }
+            for name, entry in self.models.items()
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager():
+    """Gerenciador de modelos compartilhado pelo processo."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
@@ -0,0 +1,164 @@
+# object_tracker.py
+import os
+import time
+import threading
+import traceback
+import utils
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def cpu_load():
+    """Uso de CPU do sistema entre 0 e 1 (None se não der para medir)."""
+    if psutil is not None:
+        return psutil.cpu_percent(interval=None) / 100
+    try:
+        return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+    except (OSError, AttributeError):
+        return None
+
+
+class TrackedObject:
+    def __init__(self, track_id, name, confidence, box, timestamp):
+        self.id = track_id
+        self.name = name
+        self.confidence = confidence
+        self.box = box
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.hits = 1
+
+
+class ObjectTracker:
+    """Rastreador simples por IoU: mantém os objetos vistos com ID, caixa, confiança e última aparição."""
+
+    def __init__(self, iou_threshold=0.3, max_age=3.0):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age  # segundos sem ser visto até o objeto sair da lista
+        self.objects = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def update(self, detections, timestamp=None):
+        """Associa as detecções (nome, confiança, caixa) aos objetos rastreados."""
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        with self.lock:
+            unmatched = set(self.objects)
+            for name, confidence, box in detections:
+                best_id, best_iou = None, self.iou_threshold
+                for track_id in unmatched:
+                    tracked = self.objects[track_id]
+                    if tracked.name != name:
+                        continue
+                    overlap = box_iou(tracked.box, box)
+                    if overlap >= best_iou:
+                        best_id, best_iou = track_id, overlap
+                if best_id is None:
+                    self.objects[self.next_id] = TrackedObject(self.next_id, name, confidence, box, timestamp)
+                    self.next_id += 1
+                else:
+                    unmatched.discard(best_id)
+                    tracked = self.objects[best_id]
+                    tracked.confidence = confidence
+                    tracked.box = box
+                    tracked.last_seen = timestamp
+                    tracked.hits += 1
+
+            for track_id in list(self.objects):
+                if timestamp - self.objects[track_id].last_seen > self.max_age:
+                    del self.objects[track_id]
+
+    def snapshot(self, max_age=None):
+        """Objetos vistos nos últimos max_age segundos, do mais confiante para o menos."""
+        now = time.monotonic()
+        max_age = self.max_age if max_age is None else max_age
+        with self.lock:
+            objects = [obj for obj in self.objects.values() if now - obj.last_seen <= max_age]
+        return sorted(objects, key=lambda obj: obj.confidence, reverse=True)
+
+    def best(self, max_age=None):
+        objects = self.snapshot(max_age)
+        return objects[0] if objects else None
+
+
+class BackgroundDetector:
+    """Detecção contínua em segundo plano que alimenta o rastreador.
+
+    O intervalo entre detecções se adapta: mais curto durante uma conversa,
+    mais longo quando ninguém está falando com o assistente, e sempre
+    espaçado o bastante para a inferência não passar de uma fração da CPU.
+    """
+
+    def __init__(self, vision_assistant, tracker):
+        self.vision = vision_assistant
+        self.tracker = tracker
+        self.active_interval = utils.get_setting("detection_interval_active", 0.5)
+        self.idle_interval = utils.get_setting("detection_interval_idle", 3.0)
+        self.max_duty = utils.get_setting("detection_max_cpu_share", 0.5)
+        self.active = False
+        self.interval = self.idle_interval
+        self.last_inference = None
+        self.running = False
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def set_active(self, active):
+        """Conversa em andamento: detecta com mais frequência."""
+        self.active = active
+        self.wakeup.set()
+
+    def _next_interval(self, inference_time):
+        interval = self.active_interval if self.active else self.idle_interval
+        # A inferência não deve ocupar mais que max_duty do tempo
+        interval = max(interval, inference_time / self.max_duty - inference_time)
+        load = cpu_load()
+        if load is not None and load > 0.85:
+            # CPU já ocupada (ex.: síntese ou outra análise): recua
+            interval *= 2
+        return interval
+
+    def _loop(self):
+        last_seq = None
+        while self.running:
+            try:
+                frame = self.vision.frame_grabber.latest(newer_than=last_seq, timeout=1.0)
+                if frame is None:
+                    # Captura parada (ex.: câmera sendo reconfigurada): espera sem girar em falso
+                    time.sleep(0.5)
+                    continue
+                with frame:
+                    last_seq = frame.seq
+                    started = time.perf_counter()
+                    with self.vision.models.use('yolo') as model:
+                        detections = self.vision.object_detector.detect(model, frame.image)
+                    self.last_inference = time.perf_counter() - started
+                    self.tracker.update(detections, frame.timestamp)
+                self.interval = self._next_interval(self.last_inference)
+            except Exception as e:
+                print(f"Erro na detecção em segundo plano: {e}")
+                traceback.print_exc()
+                self.interval = self.idle_interval
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
@@ -0,0 +1,148 @@
+# preview_renderer.py
+import time
+import threading
+import traceback
+import collections
+import cv2
+import numpy as np
+import utils
+
+
+class PreviewRenderer:
+    """Prepara a pré-visualização da câmera fora da thread da interface.
+
+    Redimensiona e converte para RGB em buffers pré-alocados (um sendo
+    escrito, um pronto e um exibido). Se a interface ainda não pegou o
+    quadro pronto, ele é substituído pelo mais novo, e o quadro antigo é
+    descartado. Enquanto busy() indicar inferência ou fala em andamento,
+    a taxa cai para busy_fps.
+    """
+
+    def __init__(self, frame_grabber, size, on_ready, busy=None, fps=None, busy_fps=None):
+        self.frame_grabber = frame_grabber
+        self.size = size  # (largura, altura) máximas da área de exibição
+        self.on_ready = on_ready  # chamado da thread do renderizador quando há quadro novo
+        self.busy = busy or (lambda: False)
+        self.fps = float(fps or utils.get_setting("preview_fps", 30))
+        self.busy_fps = float(busy_fps or utils.get_setting("preview_busy_fps", 10))
+        self.source_shape = None
+        self.scaled = None
+        self.buffers = []
+        self.in_use = set()
+        self.ready = None  # (índice, horário da captura, CPU da renderização)
+        self.pending = False  # sinal já enviado e ainda não atendido pela interface
+        self.dropped = 0
+        self.displayed = collections.deque()
+        self.frame_age = None
+        self.frame_cpu = None
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._render_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def _allocate(self, shape):
+        """Cria os buffers para a proporção do quadro da câmera, cabendo em self.size."""
+        height, width = shape[:2]
+        scale = min(self.size[0] / width, self.size[1] / height)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        self.source_shape = shape
+        self.scaled = np.empty((target[1], target[0], 3), dtype=np.uint8)
+        # Quadros com a interface continuam válidos: ela guarda a referência ao array antigo
+        self.buffers = [np.empty_like(self.scaled) for _ in range(3)]
+        self.in_use = set()
+        self.ready = None
+
+    def _free_buffer(self):
+        ready_index = self.ready[0] if self.ready is not None else None
+        for index in range(len(self.buffers)):
+            if index != ready_index and index not in self.in_use:
+                return index
+        return None
+
+    def _render_loop(self):
+        last_seq = None
+        while self.running:
+            started = time.monotonic()
+            try:
+                frame = self.frame_grabber.latest(newer_than=last_seq, timeout=0.5)
+                if frame is None:
+                    continue
+                cpu_started = time.thread_time()
+                with frame:
+                    last_seq = frame.seq
+                    with self.lock:
+                        if frame.image.shape != self.source_shape:
+                            self._allocate(frame.image.shape)
+                        index = self._free_buffer()
+                        scaled, buffers = self.scaled, self.buffers
+                    if index is None:
+                        continue
+                    cv2.resize(frame.image, (scaled.shape[1], scaled.shape[0]), dst=scaled, interpolation=cv2.INTER_LINEAR)
+                cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=buffers[index])
+                cpu = time.thread_time() - cpu_started
+
+                with self.lock:
+                    if buffers is not self.buffers:
+                        continue
+                    if self.ready is not None:
+                        # A interface não pegou o anterior a tempo
+                        self.dropped += 1
+                    self.ready = (index, frame.timestamp, cpu)
+                    notify = not self.pending
+                    self.pending = True
+                if notify:
+                    self.on_ready()
+            except Exception as e:
+                print(f"Erro ao preparar a pré-visualização da câmera: {e}")
+                traceback.print_exc()
+                time.sleep(0.1)
+            finally:
+                fps = self.busy_fps if self.busy() else self.fps
+                remaining = 1.0 / max(fps, 1.0) - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+    def take(self):
+        """Pega o quadro pronto para exibir: (índice, imagem RGB, horário da captura, CPU) ou None.
+
+        Devolva com release() depois de copiar a imagem para a interface.
+        """
+        with self.lock:
+            self.pending = False
+            if self.ready is None:
+                return None
+            index, timestamp, cpu = self.ready
+            self.ready = None
+            self.in_use.add(index)
+            return index, self.buffers[index], timestamp, cpu
+
+    def release(self, index, timestamp, cpu):
+        """Devolve o buffer e registra a exibição (idade do quadro e CPU gasta com ele)."""
+        now = time.monotonic()
+        with self.lock:
+            self.in_use.discard(index)
+            self.displayed.append(now)
+            while self.displayed and now - self.displayed[0] > 1.0:
+                self.displayed.popleft()
+            age = now - timestamp
+            # Médias móveis para o contador não piscar
+            self.frame_age = age if self.frame_age is None else 0.9 * self.frame_age + 0.1 * age
+            self.frame_cpu = cpu if self.frame_cpu is None else 0.9 * self.frame_cpu + 0.1 * cpu
+
+    def stats(self):
+        with self.lock:
+            return {
+                "fps": len(self.displayed),
+                "frame_age": self.frame_age,
+                "cpu_per_frame": self.frame_cpu,
+                "dropped": self.dropped,
+            }
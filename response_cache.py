@@ -0,0 +1,129 @@
+# response_cache.py
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import traceback
+import utils
+
+RESPONSE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'response_cache.db')
+
+# Palavras que indicam que a pergunta depende do que já foi dito
+CONTEXT_DEPENDENT_WORDS = {
+    "isso", "isto", "disso", "nisso", "aquilo", "ele", "ela", "eles", "elas", "dele", "dela",
+    "deles", "delas", "tambem", "outra", "outro", "anterior", "continue", "continua",
+    "repita", "repete", "novamente", "entao",
+}
+CONTEXT_DEPENDENT_PHRASES = ("de novo", "explique melhor", "e agora", "e ai")
+
+
+def normalize_message(message):
+    """Normaliza a pergunta: minúsculas, sem acentos, pontuação ou espaços repetidos."""
+    text = unicodedata.normalize('NFKD', message.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+class ResponseCache:
+    """Cache persistente (SQLite) de respostas da IA para perguntas repetidas."""
+
+    def __init__(self, path=RESPONSE_CACHE_FILE, ttl=7 * 24 * 3600, max_entries=2000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                message TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)')
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(message, context_fingerprint):
+        normalized = normalize_message(message)
+        return hashlib.sha256(f"{normalized}\0{context_fingerprint}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def context_fingerprint(*parts):
+        """Hash das partes do contexto que influenciam a resposta (personalidade, modelo...)."""
+        return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_context_dependent(message, has_history):
+        """Indica se a pergunta provavelmente depende dos turnos anteriores."""
+        if not has_history:
+            return False
+        normalized = normalize_message(message)
+        words = normalized.split()
+        if len(words) <= 2:
+            return True
+        padded = f" {normalized} "
+        if any(f" {phrase} " in padded for phrase in CONTEXT_DEPENDENT_PHRASES):
+            return True
+        return any(word in CONTEXT_DEPENDENT_WORDS for word in words)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT response, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                'UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?', (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, message, response):
+        now = time.time()
+        try:
+            with self.lock:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, message, response, created_at, last_used, hits) '
+                    'VALUES (?, ?, ?, ?, ?, 0)',
+                    (key, message, response, now, now)
+                )
+                self._evict(now)
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar no cache de respostas: {e}")
+            traceback.print_exc()
+
+    def _evict(self, now):
+        """Remove as entradas vencidas e as menos usadas acima do limite. Chamar com o lock."""
+        self.conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+        count = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def record_bypass(self):
+        with self.lock:
+            self.bypasses += 1
+
+    def stats(self):
+        with self.lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "bypasses": self.bypasses}
@@ -0,0 +1,164 @@
+# speech_pipeline.py
+import re
+import time
+import queue
+import threading
+import logging
+import traceback
+
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+
+
+def split_sentences(text, min_length=20):
+    """Divide o texto em frases, juntando fragmentos muito curtos à frase seguinte."""
+    splitter = SentenceSplitter(min_length)
+    sentences = splitter.feed(text.strip())
+    remainder = splitter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+
+class SentenceSplitter:
+    """Monta frases completas a partir de um texto que chega aos pedaços (tokens)."""
+
+    def __init__(self, min_length=20):
+        self.min_length = min_length
+        self.buffer = ""
+        self.pending = ""
+
+    def feed(self, text):
+        """Recebe mais texto e retorna as frases que ficaram completas."""
+        self.buffer += text
+        sentences = []
+        while True:
+            match = SENTENCE_END.search(self.buffer)
+            if not match:
+                break
+            part = self.buffer[:match.start()].strip()
+            self.buffer = self.buffer[match.end():]
+            self.pending = f"{self.pending} {part}".strip()
+            if len(self.pending) >= self.min_length:
+                sentences.append(self.pending)
+                self.pending = ""
+        return sentences
+
+    def flush(self):
+        """Retorna o texto restante ao final do stream."""
+        remainder = f"{self.pending} {self.buffer}".strip()
+        self.buffer = ""
+        self.pending = ""
+        return remainder
+
+
+class PipelinedSpeaker:
+    """Sintetiza a frase N+1 enquanto a frase N está tocando.
+
+    synthesize(frase) deve retornar um iterador de blocos de áudio e
+    player deve ter play(chunks, started_at) e stop().
+    """
+
+    def __init__(self, synthesize, player, lookahead=2):
+        self.synthesize = synthesize
+        self.player = player
+        self.sentences = queue.Queue()
+        # Limita quantas frases ficam sintetizadas à frente da reprodução
+        self.segments = queue.Queue(maxsize=lookahead)
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.started_at = time.perf_counter()
+        self.time_to_first_audio = None
+        self.synth_thread = threading.Thread(target=self._synth_loop, daemon=True)
+        self.play_thread = threading.Thread(target=self._play_loop, daemon=True)
+        self.synth_thread.start()
+        self.play_thread.start()
+
+    def submit(self, sentence):
+        """Enfileira uma frase para ser falada."""
+        if sentence and sentence.strip():
+            self.sentences.put(sentence.strip())
+
+    def close(self):
+        """Indica que não haverá mais frases."""
+        self.sentences.put(None)
+
+    def wait(self, timeout=None):
+        """Espera a reprodução de todas as frases (ou o cancelamento)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done.is_set() and not self.cancelled.is_set():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            self.done.wait(0.1)
+        return self.done.is_set()
+
+    def cancel(self):
+        """Descarta as frases pendentes e interrompe a reprodução atual."""
+        if self.cancelled.is_set():
+            return
+        logging.info("Fala cancelada")
+        self.cancelled.set()
+        self.player.stop()
+        self.sentences.put(None)
+        # Libera o thread de síntese se estiver bloqueado na fila cheia
+        while True:
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                break
+
+    def _put_segment(self, segment):
+        while not self.cancelled.is_set():
+            try:
+                self.segments.put(segment, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _synth_loop(self):
+        try:
+            while not self.cancelled.is_set():
+                sentence = self.sentences.get()
+                if sentence is None:
+                    break
+                chunks = queue.Queue()
+                if not self._put_segment(chunks):
+                    break
+                try:
+                    for chunk in self.synthesize(sentence):
+                        if self.cancelled.is_set():
+                            break
+                        chunks.put(chunk)
+                except Exception as e:
+                    logging.error(f"Erro ao sintetizar a frase '{sentence[:30]}': {e}")
+                    traceback.print_exc()
+                finally:
+                    chunks.put(None)
+        finally:
+            self._put_segment(None)
+
+    def _iter_chunks(self, chunks):
+        while not self.cancelled.is_set():
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def _play_loop(self):
+        try:
+            while not self.cancelled.is_set():
+                try:
+                    chunks = self.segments.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if chunks is None:
+                    break
+                started_at = self.started_at if self.time_to_first_audio is None else None
+                time_to_first_audio = self.player.play(self._iter_chunks(chunks), started_at=started_at)
+                if self.time_to_first_audio is None and time_to_first_audio is not None:
+                    self.time_to_first_audio = time_to_first_audio
+        except Exception as e:
+            logging.error(f"Erro na reprodução da fala: {e}")
+            traceback.print_exc()
+        finally:
+            self.done.set()
@@ -0,0 +1,138 @@
+# stt_engines.py
+import json
+import logging
+import threading
+import speech_recognition as sr
+import utils
+
+STT_SAMPLE_RATE = 16000
+DEFAULT_VOSK_MODEL_PATH = "models/vosk-model-small-pt-0.3"
+
+
+class RecognizerBackend:
+    """Interface comum dos motores de reconhecimento de fala."""
+
+    name = ""
+    label = ""
+    supports_partials = False
+
+    def transcribe(self, audio):
+        """Transcreve uma fala completa (sr.AudioData). Retorna o texto ou None."""
+        raise NotImplementedError
+
+    def begin(self):
+        """Inicia uma nova fala no modo streaming."""
+
+    def feed(self, pcm):
+        """Recebe PCM de 16 bits a 16 kHz. Retorna a transcrição parcial ou None."""
+        return None
+
+    def finish(self):
+        """Encerra a fala em streaming e retorna o texto final ou None."""
+        return None
+
+
+class GoogleRecognizer(RecognizerBackend):
+    """Reconhecimento online pelo serviço do Google (SpeechRecognition)."""
+
+    name = "google"
+    label = "Google (online)"
+
+    def __init__(self, language='pt-BR'):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language).strip()
+        except sr.UnknownValueError:
+            logging.warning("Não entendi o que você disse.")
+            return None
+        except sr.RequestError as e:
+            logging.error(f"Erro ao solicitar resultados do serviço de reconhecimento; {e}")
+            return None
+
+
+class VoskRecognizer(RecognizerBackend):
+    """Reconhecimento offline na CPU com Vosk, com resultados parciais."""
+
+    name = "vosk"
+    label = "Vosk (offline)"
+    supports_partials = True
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_path=None):
+        from vosk import KaldiRecognizer, SetLogLevel
+        SetLogLevel(-1)
+        self.model_path = model_path or utils.get_setting("vosk_model_path", DEFAULT_VOSK_MODEL_PATH)
+        self.model = self._load_model(self.model_path)
+        self._recognizer_class = KaldiRecognizer
+        self.recognizer = None
+        self.segments = []
+
+    @classmethod
+    def _load_model(cls, model_path):
+        """Carrega o modelo uma única vez por processo."""
+        with cls._models_lock:
+            if model_path not in cls._models:
+                from vosk import Model
+                logging.info(f"Carregando modelo Vosk de {model_path}...")
+                cls._models[model_path] = Model(model_path)
+            return cls._models[model_path]
+
+    def begin(self):
+        self.recognizer = self._recognizer_class(self.model, STT_SAMPLE_RATE)
+        self.segments = []
+
+    def feed(self, pcm):
+        if self.recognizer is None:
+            self.begin()
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.segments.append(text)
+            return " ".join(self.segments) or None
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.segments + ([partial] if partial else [])) or None
+
+    def finish(self):
+        if self.recognizer is None:
+            return None
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self.segments.append(text)
+        self.recognizer = None
+        result = " ".join(self.segments).strip()
+        return result or None
+
+    def transcribe(self, audio):
+        pcm = audio.get_raw_data(convert_rate=STT_SAMPLE_RATE, convert_width=2)
+        self.begin()
+        # Blocos de 0,25 s, como o fluxo do microfone
+        step = STT_SAMPLE_RATE // 2
+        for offset in range(0, len(pcm), step):
+            self.feed(pcm[offset:offset + step])
+        return self.finish()
+
+
+STT_BACKENDS = {
+    GoogleRecognizer.name: GoogleRecognizer,
+    VoskRecognizer.name: VoskRecognizer,
+}
+
+
+def get_stt_backend_list():
+    return [(backend.name, backend.label) for backend in STT_BACKENDS.values()]
+
+
+def create_stt_backend(name=None):
+    """Cria o motor configurado, voltando para o Google se não for possível carregá-lo."""
+    name = name or utils.get_setting("stt_engine", GoogleRecognizer.name)
+    backend_class = STT_BACKENDS.get(name, GoogleRecognizer)
+    try:
+        return backend_class()
+    except Exception as e:
+        logging.error(f"Erro ao iniciar o motor de reconhecimento {name}: {e}")
+        return GoogleRecognizer()
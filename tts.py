@@ -0,0 +1,120 @@
+# tts.py
+import logging
+import threading
+from elevenlabs.client import ElevenLabs
+from elevenlabs import Voice, VoiceSettings
+import utils
+import http_client
+from voice_registry import VoiceRegistry
+from tts_cache import TTSCache
+from speech_pipeline import split_sentences
+
+
+def create_elevenlabs_client(api_key):
+    """Cria o cliente do ElevenLabs sobre o transporte HTTP compartilhado."""
+    kwargs = {}
+    base_url = utils.get_setting("elevenlabs_base_url", None)
+    if base_url:
+        kwargs["base_url"] = base_url
+    return ElevenLabs(
+        api_key=api_key,
+        httpx_client=http_client.get_httpx_client("elevenlabs"),
+        # O SDK repassa o próprio timeout em cada requisição (None = sem limite), sobrepondo o do httpx
+        timeout=http_client.get_timeout("elevenlabs")[1],
+        **kwargs
+    )
+
+
+class SpeechSynthesizer:
+    """Síntese de voz no ElevenLabs com resolução de vozes em cache e cache de áudio."""
+
+    DEFAULT_VOICE = "Rachel"
+    CLONED_VOICE = "Cloned_User_Voice"
+    MODEL = "eleven_multilingual_v2"
+
+    def __init__(self, client, tts_cache=None, voice_registry=None):
+        self.client = client
+        self.voice_settings = VoiceSettings(
+            stability=0.71,
+            similarity_boost=0.5,
+            style=0.0,
+            use_speaker_boost=True
+        )
+
+        # Registro de vozes: resolve os IDs uma vez e reaproveita entre execuções
+        self.voice_registry = voice_registry or VoiceRegistry(client)
+        if self.voice_registry.get(self.DEFAULT_VOICE) is None:
+            self.voice_registry.refresh_in_background()
+        self.cloned_voice_id = self.voice_registry.get(self.CLONED_VOICE)
+        self.using_cloned_voice = False
+
+        # Cache de áudio sintetizado para frases repetidas
+        if tts_cache is None:
+            cache_max_mb = utils.get_setting("tts_cache_max_mb", 100)
+            tts_cache = TTSCache(max_bytes=int(cache_max_mb) * 1024 * 1024)
+        self.tts_cache = tts_cache
+
+    def set_cloned_voice(self, voice_id):
+        self.cloned_voice_id = voice_id
+        self.voice_registry.register(self.CLONED_VOICE, voice_id)
+        self.using_cloned_voice = True
+
+    def get_voice(self):
+        """Retorna a voz a ser usada na síntese (clonada ou padrão)."""
+        if self.using_cloned_voice and self.cloned_voice_id:
+            return Voice(voice_id=self.cloned_voice_id)
+
+        voice_id = self.voice_registry.resolve(self.DEFAULT_VOICE)
+        if voice_id is None:
+            raise RuntimeError("Nenhuma voz disponível no ElevenLabs.")
+        return Voice(voice_id=voice_id, settings=self.voice_settings)
+
+    def _cache_key(self, text, voice, output_format):
+        return self.tts_cache.make_key(text, voice.voice_id, self.MODEL, voice.settings, output_format)
+
+    def synthesize(self, text, output_format="mp3_44100_128"):
+        """Gera blocos de áudio para o texto, usando o cache quando possível."""
+        voice = self.get_voice()
+        key = self._cache_key(text, voice, output_format)
+        cached = self.tts_cache.get(key)
+        if cached is not None:
+            logging.info("Áudio encontrado no cache de TTS")
+            yield cached
+            return
+
+        chunks = []
+        with http_client.guarded("elevenlabs"):
+            for chunk in self.client.generate(
+                text=text,
+                voice=voice,
+                model=self.MODEL,
+                stream=True,
+                output_format=output_format
+            ):
+                chunks.append(chunk)
+                yield chunk
+        # Só grava no cache quando o áudio foi recebido por completo
+        self.tts_cache.put(key, b''.join(chunks))
+
+    def prewarm(self, phrases, output_format, by_sentence=True):
+        """Sintetiza em segundo plano as frases fixas que ainda não estão no cache."""
+        # No modo streaming a fala é sintetizada frase a frase
+        if by_sentence:
+            phrases = [sentence for phrase in phrases for sentence in split_sentences(phrase)]
+
+        def worker():
+            count = 0
+            for phrase in dict.fromkeys(phrases):
+                try:
+                    if self.tts_cache.contains(self._cache_key(phrase, self.get_voice(), output_format)):
+                        continue
+                    for _ in self.synthesize(phrase, output_format):
+                        pass
+                    count += 1
+                except Exception as e:
+                    logging.error(f"Erro ao pré-sintetizar '{phrase[:30]}': {e}")
+            logging.info(f"Pré-aquecimento do cache de TTS concluído ({count} novas frases)")
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,127 @@
+# tts_cache.py
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+import utils
+
+TTS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'tts_cache')
+
+
+class TTSCache:
+    """Cache em disco de áudio sintetizado, endereçado pelo conteúdo e com despejo LRU."""
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # chave -> tamanho em bytes, do menos para o mais recentemente usado
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Reconstrói o índice LRU a partir dos arquivos existentes."""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.audio'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-len('.audio')], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+        logging.info(f"Cache de TTS: {len(self.entries)} entradas, {self.total_bytes / 1024:.0f} KB")
+
+    @staticmethod
+    def make_key(text, voice_id, model, voice_settings, output_format):
+        """Gera a chave do cache a partir de tudo que influencia o áudio."""
+        settings = None
+        if voice_settings is not None:
+            settings = {
+                "stability": getattr(voice_settings, "stability", None),
+                "similarity_boost": getattr(voice_settings, "similarity_boost", None),
+                "style": getattr(voice_settings, "style", None),
+                "use_speaker_boost": getattr(voice_settings, "use_speaker_boost", None),
+            }
+        payload = json.dumps({
+            "text": text,
+            "voice_id": voice_id,
+            "model": model,
+            "settings": settings,
+            "output_format": output_format,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def contains(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        """Retorna os bytes do áudio ou None."""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            with self.lock:
+                self.total_bytes -= self.entries.pop(key, 0)
+            return None
+
+    def put(self, key, data):
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Erro ao gravar áudio no cache: {e}")
+            return
+        with self.lock:
+            self.total_bytes -= self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self.total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Remove as entradas menos usadas até caber no limite. Chamar com o lock."""
+        while self.total_bytes > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
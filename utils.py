@@ -1,11 +1,16 @@
 import json
 import os
 import cv2
+import threading
 import traceback
 import sounddevice as sd
 
 SETTINGS_FILE = 'settings.json'
 
+# Serializa as gravações: cada uma lê, altera e regrava o arquivo inteiro, e
+# threads diferentes (interface, calibração do microfone) gravam ao mesmo tempo
+_settings_lock = threading.RLock()
+
 def get_setting(key, default=None):
     try:
         if os.path.exists(SETTINGS_FILE):
@@ -20,14 +25,22 @@ def get_setting(key, default=None):
         return default
 
 def set_setting(key, value):
+    update_setting(key, lambda current: value)
+
+def update_setting(key, update, default=None):
+    """Grava update(valor atual) em uma única operação, sem perder gravações de outras threads."""
     try:
-        settings = {}
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r') as f:
-                settings = json.load(f)
-        settings[key] = value
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=4)
+        with _settings_lock:
+            settings = {}
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    settings = json.load(f)
+            settings[key] = update(settings.get(key, default))
+            # Arquivo temporário + replace: quem lê nunca encontra o arquivo pela metade
+            temp_file = SETTINGS_FILE + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(settings, f, indent=4)
+            os.replace(temp_file, SETTINGS_FILE)
     except Exception as e:
         print(f"Erro ao salvar a configuração {key}: {e}")
         traceback.print_exc()
@@ -6,8 +6,55 @@ import threading
 import os
 from deepface import DeepFace
 import torch
-from ultralytics import YOLO
 import traceback
+import contextlib
+from frame_grabber import FrameGrabber
+from model_manager import get_model_manager
+from detection import ObjectDetector
+from face_analysis import FaceAnalyzer
+from object_tracker import ObjectTracker, BackgroundDetector
+from face_index import FaceIndex
+from change_detector import ChangeDetector, InferenceCache
+import camera_profiles
+
+# Modelos de atributos faciais do DeepFace, por ação
+FACE_ATTRIBUTE_MODELS = {'age': 'Age', 'gender': 'Gender', 'emotion': 'Emotion', 'race': 'Race'}
+
+
+def load_deepface_model(model_name):
+    try:
+        return DeepFace.build_model(model_name=model_name, task="facial_attribute")
+    except TypeError:
+        # Versões antigas do DeepFace não têm o parâmetro task
+        return DeepFace.build_model(model_name)
+
+
+def load_deepface_recognition_model(model_name):
+    try:
+        return DeepFace.build_model(model_name=model_name, task="facial_recognition")
+    except TypeError:
+        return DeepFace.build_model(model_name)
+
+
+def forget_deepface_model(model_name, task="facial_attribute"):
+    """Remove o modelo do cache interno do DeepFace para a memória ser liberada."""
+    try:
+        from deepface.modules import modeling
+        getattr(modeling, 'cached_models', {}).get(task, {}).pop(model_name, None)
+    except ImportError:
+        pass
+
+
+def warm_up_face_action(action):
+    # Uma análise em imagem vazia, sem detecção, passa pelo mesmo caminho da análise real
+    DeepFace.analyze(
+        np.zeros((224, 224, 3), dtype=np.uint8),
+        actions=[action],
+        detector_backend='skip',
+        enforce_detection=False,
+        silent=True
+    )
+
 
 class VisionAssistant:
     def __init__(self):
@@ -16,19 +63,60 @@ class VisionAssistant:
             self.camera_backend = utils.get_setting("camera_backend", "AUTO")
             self.camera_lock = threading.Lock()
 
-            # Abrir a câmera uma vez
-            backend = self.get_backend()
-            self.cap = cv2.VideoCapture(self.camera_index, backend)
+            # Abrir a câmera uma vez, com o perfil de captura salvo para ela
+            self.capture_profile = camera_profiles.get_camera_profile(self.camera_index)
+            self.cap, self.capture_properties = camera_profiles.open_camera(
+                self.camera_index, self.get_backend(), self.capture_profile)
             self.camera_available = self.cap.isOpened()
             if not self.camera_available:
                 print("Não foi possível abrir a câmera.")
 
+            # Captura contínua em segundo plano: ninguém mais espera por cap.read()
+            self.frame_grabber = FrameGrabber(self.cap)
+            if self.camera_available:
+                self.frame_grabber.start()
+
             if self.camera_available:
                 # Inicialize o modelo de detecção de objetos usando YOLO
                 try:
                     self.device = "cuda" if torch.cuda.is_available() else "cpu"
-                    # Atualizado para usar o modelo mais preciso
-                    self.object_detector = YOLO('yolov8s.pt')
+                    # Os modelos são carregados sob demanda e descarregados quando ficam ociosos
+                    self.models = get_model_manager()
+                    # Atualizado para usar o modelo mais preciso, no backend de CPU escolhido
+                    self.object_detector = ObjectDetector()
+                    self.models.register('yolo', self.object_detector.load, warmup=self.object_detector.warmup)
+                    for action, model_name in FACE_ATTRIBUTE_MODELS.items():
+                        self.models.register(
+                            f'face_{action}',
+                            lambda model_name=model_name: load_deepface_model(model_name),
+                            warmup=lambda model, action=action: warm_up_face_action(action),
+                            unloader=lambda model, model_name=model_name: forget_deepface_model(model_name)
+                        )
+                    # Detecção do rosto em cascata, uma única vez por análise
+                    self.face_analyzer = FaceAnalyzer()
+                    # Identificação dos usuários cadastrados
+                    self.face_index = FaceIndex()
+                    self.models.register(
+                        'face_embedding',
+                        lambda: load_deepface_recognition_model(self.face_index.model_name),
+                        unloader=lambda model: forget_deepface_model(self.face_index.model_name, "facial_recognition")
+                    )
+                    try:
+                        self.face_index.load()
+                    except Exception as e:
+                        print(f"Erro ao carregar o índice facial: {e}")
+                        traceback.print_exc()
+                    # Cena parada: reaproveita o último resultado em vez de rodar a inferência de novo
+                    self.inference_cache = InferenceCache(ChangeDetector(self.camera_index))
+                    # Objetos vistos recentemente, para responder sem rodar o detector de novo
+                    self.object_tracker = ObjectTracker(max_age=utils.get_setting("tracker_max_age", 3.0))
+                    self.background_detector = None
+                    # Aquecer em segundo plano para a primeira pergunta não esperar o carregamento
+                    if utils.get_setting("model_warmup", True):
+                        self.models.warm_up()
+                    if utils.get_setting("background_detection", False):
+                        self.background_detector = BackgroundDetector(self, self.object_tracker)
+                        self.background_detector.start()
 
                     # Dicionário para tradução dos objetos
                     self.object_translation = {
@@ -163,6 +251,10 @@ class VisionAssistant:
 
     def __del__(self):
         # Liberar a câmera quando o objeto for destruído
+        if getattr(self, 'background_detector', None) is not None:
+            self.background_detector.stop()
+        if hasattr(self, 'frame_grabber') and not self.frame_grabber.stop(timeout=1.0):
+            return  # A thread de captura ainda está lendo: liberar a câmera agora seria inseguro
         if hasattr(self, 'cap') and self.cap.isOpened():
             self.cap.release()
 
@@ -176,50 +268,87 @@ class VisionAssistant:
         backend = backend_options.get(self.camera_backend, cv2.CAP_ANY)
         return backend
 
-    def capture_image(self):
+    def stop_capture(self):
+        """Para a captura contínua antes de mexer na câmera; False se a thread não saiu."""
+        if self.frame_grabber.stop(timeout=5.0):
+            return True
+        print("A captura da câmera não parou; a câmera não será reconfigurada.")
+        return False
+
+    def set_capture_profile(self, profile):
+        """Reabre a câmera com outro perfil, parando a captura contínua enquanto isso."""
         with self.camera_lock:
-            if not self.cap.isOpened():
-                print("Câmera não está aberta.")
-                return None
-            ret, frame = self.cap.read()
-            if not ret or frame is None:
-                print("Erro ao capturar a imagem da câmera.")
-                return None
-            # Verifique se a imagem tem 3 canais
-            if len(frame.shape) == 3 and frame.shape[2] == 3:
-                return frame
-            else:
-                print("Imagem capturada não está em formato RGB.")
+            if not self.stop_capture():
+                return False
+            self.cap.release()
+            self.capture_profile = profile
+            self.cap, self.capture_properties = camera_profiles.open_camera(
+                self.camera_index, self.get_backend(), profile)
+            self.frame_grabber.cap = self.cap
+            if self.cap.isOpened():
+                self.frame_grabber.start()
+            if hasattr(self, 'inference_cache'):
+                # Resultados guardados são de quadros com outra resolução
+                self.inference_cache.invalidate()
+        return self.cap.isOpened()
+
+    def measure_capture_profiles(self):
+        """Mede todos os perfis nesta câmera e volta para o perfil atual."""
+        with self.camera_lock:
+            if not self.stop_capture():
                 return None
+            self.cap.release()
+            try:
+                results = camera_profiles.measure_profiles(self.camera_index, self.get_backend())
+            finally:
+                self.cap, self.capture_properties = camera_profiles.open_camera(
+                    self.camera_index, self.get_backend(), self.capture_profile)
+                self.frame_grabber.cap = self.cap
+                if self.cap.isOpened():
+                    self.frame_grabber.start()
+        camera_profiles.save_profile_measurements(self.camera_index, results)
+        return results
+
+    def get_frame(self, fresh=False):
+        """Retorna o último quadro (Frame, sem cópia e somente leitura) ou None.
+
+        Com fresh=True espera um quadro capturado depois da chamada, para a
+        inferência nunca usar uma imagem antiga.
+        """
+        if not self.cap.isOpened():
+            print("Câmera não está aberta.")
+            return None
+        frame = self.frame_grabber.fresh() if fresh else self.frame_grabber.latest()
+        if frame is None:
+            print("Erro ao capturar a imagem da câmera.")
+        return frame
+
+    def capture_image(self):
+        """Retorna uma cópia do quadro mais recente, sem esperar pela câmera."""
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        with frame:
+            return frame.image.copy()
 
     def recognize_object(self):
         if not self.camera_available:
             print("Câmera não disponível.")
             return None
 
-        frame = self.capture_image()
+        frame = self.get_frame(fresh=True)
         if frame is None:
             print("Imagem capturada é inválida.")
             return None
 
         try:
-            results = self.object_detector(frame)
-            if results:
-                highest_confidence = 0
-                best_object_name = None
-                for result in results:
-                    if result.boxes and len(result.boxes) > 0:
-                        for box in result.boxes:
-                            conf = box.conf.cpu().item()
-                            if conf > highest_confidence:
-                                highest_confidence = conf
-                                class_id = int(box.cls.cpu().item())
-                                object_name = result.names[class_id]
-                                # Traduzir o nome do objeto para o português
-                                object_name_pt = self.object_translation.get(object_name, object_name)
-                                best_object_name = object_name_pt
-                if best_object_name:
-                    return best_object_name
+            with frame:
+                detections = self.inference_cache.run('object', frame.image, lambda: self.detect_objects(frame.image))
+                self.object_tracker.update(detections, frame.timestamp)
+            if detections:
+                # Detecção mais confiante, com o nome traduzido para o português
+                object_name = detections[0][0]
+                return self.object_translation.get(object_name, object_name)
             print("Nenhum objeto identificado.")
             return None
         except Exception as e:
@@ -227,65 +356,148 @@ class VisionAssistant:
             traceback.print_exc()
             return None
 
-    def analyze_face_attributes(self):
+    def detect_objects(self, image):
+        with self.models.use('yolo') as model:
+            return self.object_detector.detect(model, image)
+
+    def recent_object(self, max_age=None):
+        """Objeto mais confiante visto pelo rastreador nos últimos max_age segundos (traduzido), ou None."""
         if not self.camera_available:
-            print("Câmera não disponível.")
             return None
+        if max_age is None:
+            max_age = utils.get_setting("tracker_fresh_seconds", 1.5)
+        tracked = self.object_tracker.best(max_age)
+        if tracked is None:
+            return None
+        return self.object_translation.get(tracked.name, tracked.name)
+
+    def set_conversation_active(self, active):
+        """Durante a conversa a detecção em segundo plano roda com mais frequência."""
+        if getattr(self, 'background_detector', None) is not None:
+            self.background_detector.set_active(active)
 
-        frame = self.capture_image()
+    def capture_fresh_image(self):
+        """Cópia de um quadro capturado depois da chamada, ou None."""
+        frame = self.get_frame(fresh=True)
         if frame is None:
-            print("Imagem capturada é inválida.")
             return None
+        with frame:
+            return frame.image.copy()
+
+    def face_embedding(self, image):
+        """Codificação do maior rosto da imagem, ou None."""
+        face, _ = self.face_analyzer.detect(image)
+        if face is None:
+            print("Nenhum rosto detectado para identificação.")
+            return None
+        with self.models.use('face_embedding'):
+            return self.face_analyzer.represent(face, self.face_index.model_name)
 
+    def identify_user(self):
+        """Nome do usuário cadastrado que está na frente da câmera, ou None."""
+        if not self.camera_available:
+            print("Câmera não disponível.")
+            return None
         try:
-            # Converter a imagem para RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Tentar usar vários backends para melhorar a detecção
-            backends = ['opencv', 'mtcnn', 'ssd', 'dlib']
-            for backend in backends:
-                try:
-                    # Analisar atributos faciais usando DeepFace com enforce_detection=False
-                    result = DeepFace.analyze(
-                        frame_rgb,
-                        actions=['age', 'gender', 'emotion', 'race'],
-                        detector_backend=backend,
-                        enforce_detection=False
-                    )
-                    # Verificar se há rosto detectado
-                    if result:
-                        # Se o resultado for uma lista, pegar o primeiro elemento
-                        if isinstance(result, list) and len(result) > 0:
-                            result = result[0]
-                        if isinstance(result, dict) and 'age' in result:
-                            # Traduzir emoções
-                            dominant_emotion = result.get('dominant_emotion', '')
-                            if isinstance(dominant_emotion, str) and dominant_emotion in self.emotion_translation:
-                                result['dominant_emotion'] = self.emotion_translation[dominant_emotion]
-                            else:
-                                print(f"dominant_emotion não é uma string ou não está no dicionário de tradução: {dominant_emotion}")
-
-                            # Traduzir gênero usando 'dominant_gender'
-                            dominant_gender = result.get('dominant_gender', '')
-                            if isinstance(dominant_gender, str) and dominant_gender in self.gender_translation:
-                                result['dominant_gender'] = self.gender_translation[dominant_gender]
-                            else:
-                                print(f"dominant_gender não é uma string ou não está no dicionário de tradução: {dominant_gender}")
-
-                            # Traduzir etnia/raça
-                            dominant_race = result.get('dominant_race', '')
-                            if isinstance(dominant_race, str) and dominant_race in self.race_translation:
-                                result['dominant_race'] = self.race_translation[dominant_race]
-                            else:
-                                print(f"dominant_race não é uma string ou não está no dicionário de tradução: {dominant_race}")
-
-                            return result  # Retorna os resultados da análise
-                except Exception as e:
-                    print(f"Erro ao analisar atributos faciais com backend {backend}: {e}")
-                    continue
-            print("Nenhum rosto detectado para análise de atributos.")
+            image = self.capture_fresh_image()
+            if image is None:
+                return None
+            return self.inference_cache.run('user', image, lambda: self._identify(image))
+        except Exception as e:
+            print(f"Erro ao identificar o usuário: {e}")
+            traceback.print_exc()
+            return None
+
+    def _identify(self, image):
+        embedding = self.face_embedding(image)
+        if embedding is None:
+            return None
+        match = self.face_index.identify(embedding)
+        if match is None:
+            return None
+        user_id, name, score = match
+        print(f"Usuário identificado: {name} (similaridade {score:.2f})")
+        return name
+
+    def enroll_user(self, name):
+        """Cadastra o rosto visível com o nome dado. Retorna True se deu certo."""
+        if not self.camera_available:
+            print("Câmera não disponível.")
+            return False
+        try:
+            image = self.capture_fresh_image()
+            embedding = self.face_embedding(image) if image is not None else None
+            if embedding is None:
+                return False
+            self.face_index.enroll(name, embedding)
+            # A identificação guardada para esta cena ficou desatualizada
+            self.inference_cache.invalidate('user')
+            return True
+        except Exception as e:
+            print(f"Erro ao cadastrar o usuário: {e}")
+            traceback.print_exc()
+            return False
+
+    def _analyze_face(self, image, actions):
+        with contextlib.ExitStack() as stack:
+            # Carrega pelo gerenciador só os modelos das ações pedidas
+            for action in actions:
+                stack.enter_context(self.models.use(f'face_{action}'))
+            return self.face_analyzer.analyze(image, actions)
+
+    def inference_stats(self):
+        """Inferências executadas e puladas por cena parada, e CPU economizada."""
+        return self.inference_cache.stats()
+
+    def analyze_face_attributes(self, actions=None):
+        """Analisa só os atributos pedidos (idade, gênero, emoção, etnia) do rosto visível."""
+        if not self.camera_available:
+            print("Câmera não disponível.")
+            return None
+
+        # Cópia própria do quadro, em BGR como o DeepFace espera
+        image = self.capture_fresh_image()
+        if image is None:
+            print("Imagem capturada é inválida.")
             return None
 
+        actions = actions or list(FACE_ATTRIBUTE_MODELS)
+        try:
+            key = 'face_' + '_'.join(sorted(actions))
+            result = self.inference_cache.run(key, image, lambda: self._analyze_face(image, actions))
+            if not result:
+                print("Nenhum rosto detectado para análise de atributos.")
+                return None
+            # O resultado guardado no cache continua em inglês
+            result = dict(result)
+
+            # Traduzir emoções
+            dominant_emotion = result.get('dominant_emotion')
+            if dominant_emotion is not None:
+                if isinstance(dominant_emotion, str) and dominant_emotion in self.emotion_translation:
+                    result['dominant_emotion'] = self.emotion_translation[dominant_emotion]
+                else:
+                    print(f"dominant_emotion não é uma string ou não está no dicionário de tradução: {dominant_emotion}")
+
+            # Traduzir gênero usando 'dominant_gender'
+            dominant_gender = result.get('dominant_gender')
+            if dominant_gender is not None:
+                if isinstance(dominant_gender, str) and dominant_gender in self.gender_translation:
+                    result['dominant_gender'] = self.gender_translation[dominant_gender]
+                else:
+                    print(f"dominant_gender não é uma string ou não está no dicionário de tradução: {dominant_gender}")
+
+            # Traduzir etnia/raça
+            dominant_race = result.get('dominant_race')
+            if dominant_race is not None:
+                if isinstance(dominant_race, str) and dominant_race in self.race_translation:
+                    result['dominant_race'] = self.race_translation[dominant_race]
+                else:
+                    print(f"dominant_race não é uma string ou não está no dicionário de tradução: {dominant_race}")
+
+            return result  # Retorna os resultados da análise
+
         except Exception as e:
             print(f"Erro ao analisar atributos faciais: {e}")
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
@@ -1,31 +1,22 @@
 import time
 import speech_recognition as sr
-from elevenlabs.client import ElevenLabs
-from elevenlabs import Voice, VoiceSettings
 import os
 import threading
 import utils
 import traceback
+from audio_stream import StreamingAudioPlayer, STREAM_OUTPUT_FORMAT
+from tts import SpeechSynthesizer, create_elevenlabs_client
+from mic_stream import MicrophoneStream
+from stt_engines import create_stt_backend
+from speech_pipeline import PipelinedSpeaker, split_sentences
 import logging
-import sys
-
-# Importações do PyQt5
-from PyQt5.QtCore import QObject, QUrl, QEventLoop
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+import logging_setup
 
 # Configuração de logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('voice_assistant.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-class VoiceAssistant(QObject):
+logging_setup.setup_logging()
+
+class VoiceAssistant:
     def __init__(self):
-        super().__init__()
         logging.info("Iniciando VoiceAssistant...")
 
         # Obter chave de API do ElevenLabs
@@ -37,7 +28,7 @@ class VoiceAssistant(QObject):
 
         try:
             # Configurar API do ElevenLabs
-            self.eleven = ElevenLabs(api_key=elevenlabs_api_key)
+            self.eleven = create_elevenlabs_client(elevenlabs_api_key)
             logging.info("ElevenLabs API inicializada com sucesso")
         except Exception as e:
             logging.error(f"Erro ao inicializar ElevenLabs API: {e}")
@@ -46,25 +37,33 @@ class VoiceAssistant(QObject):
         # Verificar dispositivos de áudio disponíveis
         self._check_audio_devices()
 
-        # Inicializar reconhecedor de voz
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 3000
-        self.recognizer.dynamic_energy_threshold = True
+        # Inicializar reconhecedor de voz (Google online ou motor offline)
+        self.stt_backend = create_stt_backend()
+        logging.info(f"Motor de reconhecimento de fala: {self.stt_backend.name}")
         self.microphone_index = utils.get_setting("microphone_index", None)
 
-        # Inicializar QMediaPlayer para reprodução de áudio
-        self.player = QMediaPlayer()
-        self.player.setVolume(100)  # Ajustar volume conforme necessário
+        # Captura contínua: o microfone fica aberto e a calibração é feita em segundo plano
+        self.mic_stream = MicrophoneStream(self.microphone_index)
+        self._start_mic_stream()
+
+        # QMediaPlayer só é criado no modo sem streaming, para o assistente rodar sem Qt
+        self.player = None
 
-        # Configurações de voz
-        self.DEFAULT_VOICE = "Rachel"
-        self.cloned_voice = None
-        self.using_cloned_voice = False
+        # Reprodução em streaming: toca o áudio direto da memória, sem arquivo temporário
+        self.streaming_enabled = utils.get_setting("tts_streaming", True)
+        self.audio_output = StreamingAudioPlayer()
+        self.last_time_to_first_audio = None
+        self.current_speech = None
+
+        # Síntese de voz (vozes e áudio em cache)
+        self.synthesizer = SpeechSynthesizer(self.eleven)
 
         # Controle de threads
         self.lock = threading.Lock()
         self.should_listen = threading.Event()
         self.should_listen.set()
+        # Gravação de amostras para clonagem: a escuta da conversa cede o microfone
+        self.recording_samples = threading.Event()
 
     def _check_audio_devices(self):
         """Verifica e lista todos os dispositivos de áudio disponíveis"""
@@ -85,58 +84,107 @@ class VoiceAssistant(QObject):
         except Exception as e:
             logging.error(f"Erro ao verificar dispositivos de áudio do sistema: {e}")
 
-    def listen(self):
-        """Captura áudio e retorna o texto transcrito."""
+    def _start_mic_stream(self):
+        try:
+            self.mic_stream.start()
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao abrir o microfone: {e}")
+            return False
+
+    def listen(self, on_partial=None):
+        """Captura áudio e retorna o texto transcrito.
+
+        Com motores de streaming, on_partial recebe as transcrições parciais
+        enquanto o usuário ainda está falando.
+        """
         logging.info("Iniciando captura de áudio...")
+        backend = self.stt_backend
+        streaming = backend.supports_partials
+        stream_state = {"utterance_id": None, "partial": None}
+        stream_lock = threading.Lock()
+
+        def on_frame(utterance_id, pcm, started):
+            with stream_lock:
+                if stream_state["utterance_id"] is None:
+                    if not started:
+                        # Fala já em andamento: sem o início, transcreve o áudio completo no fim
+                        return
+                    stream_state["utterance_id"] = utterance_id
+                    backend.begin()
+                elif stream_state["utterance_id"] != utterance_id:
+                    return
+                partial = backend.feed(pcm)
+            if partial and partial != stream_state["partial"]:
+                stream_state["partial"] = partial
+                if on_partial:
+                    on_partial(partial)
+
         try:
             with self.lock:
-                if self.microphone_index is not None:
-                    mic = sr.Microphone(device_index=int(self.microphone_index))
-                else:
-                    mic = sr.Microphone()
+                if not self.mic_stream.running.is_set() and not self._start_mic_stream():
+                    return None
 
-                with mic as source:
+                if streaming:
+                    self.mic_stream.add_frame_listener(on_frame)
+                try:
                     logging.info("Ouvindo...")
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    while self.should_listen.is_set():
-                        try:
-                            audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                            break
-                        except sr.WaitTimeoutError:
-                            logging.warning("Timeout na escuta")
-                            return None
-                        except sr.UnknownValueError:
-                            logging.warning("Áudio não reconhecido")
-                            return None
-                        except sr.RequestError as e:
-                            logging.error(f"Erro no serviço de reconhecimento: {e}")
-                            return None
+                    audio = self.mic_stream.next_utterance(timeout=5, should_continue=self._should_continue_listening)
+                finally:
+                    if streaming:
+                        self.mic_stream.remove_frame_listener(on_frame)
+
+                if audio is None:
+                    if self._should_continue_listening():
+                        logging.warning("Timeout na escuta")
                     else:
                         logging.info("Escuta interrompida")
-                        return None
-
-                try:
-                    text = self.recognizer.recognize_google(audio, language='pt-BR')
-                    logging.info(f"Texto reconhecido: {text}")
-                    return text.strip()
-                except sr.UnknownValueError:
-                    logging.warning("Não entendi o que você disse.")
                     return None
-                except sr.RequestError as e:
-                    logging.error(f"Erro ao solicitar resultados do serviço de reconhecimento; {e}")
+
+                with stream_lock:
+                    streamed = streaming and stream_state["utterance_id"] == getattr(audio, "utterance_id", None)
+                    text = backend.finish() if streamed else backend.transcribe(audio)
+
+                if not text:
                     return None
+                logging.info(f"Texto reconhecido ({backend.name}): {text}")
+                return text.strip()
 
         except Exception as e:
             logging.error(f"Erro ao acessar o microfone: {e}")
             traceback.print_exc()
             return None
 
+    def _should_continue_listening(self):
+        return self.should_listen.is_set() and not self.recording_samples.is_set()
+
+    @property
+    def using_cloned_voice(self):
+        return self.synthesizer.using_cloned_voice
+
+    @using_cloned_voice.setter
+    def using_cloned_voice(self, value):
+        self.synthesizer.using_cloned_voice = value
+
+    def _synthesize(self, text, output_format="mp3_44100_128"):
+        """Gera blocos de áudio para o texto, usando o cache quando possível."""
+        return self.synthesizer.synthesize(text, output_format)
+
+    def prewarm(self, phrases):
+        """Sintetiza em segundo plano as frases fixas que ainda não estão no cache."""
+        output_format = STREAM_OUTPUT_FORMAT if self.streaming_enabled else "mp3_44100_128"
+        return self.synthesizer.prewarm(phrases, output_format, by_sentence=self.streaming_enabled)
+
     def speak(self, text):
         """Converte texto em fala usando o ElevenLabs e reproduz o áudio."""
         if not text:
             logging.warning("Texto vazio, nada para falar")
             return
 
+        if self.streaming_enabled:
+            self._speak_streaming(text)
+            return
+
         logging.info(f"Iniciando conversão do texto: {text[:50]}...")
         try:
             # Gerar um nome de arquivo temporário único
@@ -145,31 +193,7 @@ class VoiceAssistant(QObject):
             # Gerar áudio
             logging.info("Gerando áudio com ElevenLabs...")
             try:
-                if self.using_cloned_voice and self.cloned_voice:
-                    # Usar a voz clonada
-                    audio = self.eleven.generate(
-                        text=text,
-                        voice=self.cloned_voice,
-                        model="eleven_multilingual_v2"
-                    )
-                else:
-                    # Usar a voz padrão
-                    voices = self.eleven.voices.get_all()
-                    default_voice = next((v for v in voices.voices if v.name == self.DEFAULT_VOICE), voices.voices[0])
-
-                    audio = self.eleven.generate(
-                        text=text,
-                        voice=Voice(
-                            voice_id=default_voice.voice_id,
-                            settings=VoiceSettings(
-                                stability=0.71,
-                                similarity_boost=0.5,
-                                style=0.0,
-                                use_speaker_boost=True
-                            )
-                        ),
-                        model="eleven_multilingual_v2"
-                    )
+                audio = self._synthesize(text)
                 logging.info("Áudio gerado com sucesso")
             except Exception as e:
                 logging.error(f"Erro na geração do áudio: {e}")
@@ -195,6 +219,12 @@ class VoiceAssistant(QObject):
             # Reproduzir áudio usando QMediaPlayer
             logging.info("Iniciando reprodução do áudio com QMediaPlayer...")
             try:
+                from PyQt5.QtCore import QUrl
+                from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+                if self.player is None:
+                    self.player = QMediaPlayer()
+                    self.player.setVolume(100)  # Ajustar volume conforme necessário
+
                 # Resetar o media player
                 self.player.stop()
                 self.player.setMedia(QMediaContent())
@@ -222,8 +252,47 @@ class VoiceAssistant(QObject):
             logging.error(f"Erro no processo de fala: {e}")
             traceback.print_exc()
 
+    def begin_speech(self):
+        """Inicia uma fala em pipeline; as frases são enviadas com submit()."""
+        self.stop_speaking()
+        self.current_speech = PipelinedSpeaker(
+            lambda sentence: self._synthesize(sentence, output_format=STREAM_OUTPUT_FORMAT),
+            self.audio_output
+        )
+        return self.current_speech
+
+    def finish_speech(self, speech):
+        """Espera a fala terminar e registra o tempo até o primeiro áudio."""
+        speech.close()
+        speech.wait()
+        self.last_time_to_first_audio = speech.time_to_first_audio
+        if speech.time_to_first_audio is not None:
+            logging.info(f"Tempo até o primeiro áudio da resposta: {speech.time_to_first_audio * 1000:.0f} ms")
+        logging.info("Reprodução concluída")
+
+    def _speak_streaming(self, text):
+        """Fala frase a frase: a próxima é sintetizada enquanto a atual toca."""
+        logging.info(f"Iniciando conversão do texto (streaming): {text[:50]}...")
+        try:
+            speech = self.begin_speech()
+            for sentence in split_sentences(text):
+                speech.submit(sentence)
+            self.finish_speech(speech)
+        except Exception as e:
+            logging.error(f"Erro no processo de fala: {e}")
+            traceback.print_exc()
+
+    def stop_speaking(self):
+        """Interrompe a fala em andamento e descarta as frases pendentes."""
+        if self.current_speech is not None:
+            self.current_speech.cancel()
+            self.current_speech = None
+        self.audio_output.stop()
+
     def _wait_for_audio_to_finish(self):
         """Espera a reprodução do áudio terminar."""
+        from PyQt5.QtCore import QEventLoop
+        from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
         loop = QEventLoop()
         self.player.mediaStatusChanged.connect(
             lambda status: loop.quit() if status == QMediaPlayer.EndOfMedia else None
@@ -236,22 +305,28 @@ class VoiceAssistant(QObject):
     def record_voice_samples(self):
         """Grava amostras da voz do usuário para clonagem."""
         samples = []
-        r = sr.Recognizer()
 
         logging.info("Vou gravar 3 amostras da sua voz. Fale algumas frases para cada amostra.")
 
-        for i in range(3):
-            with sr.Microphone(device_index=self.microphone_index) as source:
-                logging.info(f"Gravando amostra {i + 1}/3... Fale por alguns segundos.")
-                # Ajustar para o ruído de fundo
-                r.adjust_for_ambient_noise(source, duration=0.5)
-                audio = r.listen(source, timeout=5, phrase_time_limit=10)
-
-                # Salvar temporariamente o arquivo de áudio
-                sample_filename = f"voice_sample_{i}.mp3"
-                with open(sample_filename, "wb") as f:
-                    f.write(audio.get_wav_data())
-                samples.append(sample_filename)
+        # A escuta em andamento desiste e a próxima espera no lock: as falas
+        # gravadas aqui não viram novas perguntas na conversa
+        self.recording_samples.set()
+        try:
+            with self.lock:
+                for i in range(3):
+                    logging.info(f"Gravando amostra {i + 1}/3... Fale por alguns segundos.")
+                    self.mic_stream.clear()
+                    audio = self.mic_stream.next_utterance(timeout=5)
+                    if audio is None:
+                        raise RuntimeError("Nenhuma fala detectada para a amostra de voz.")
+
+                    # Salvar temporariamente o arquivo de áudio
+                    sample_filename = f"voice_sample_{i}.mp3"
+                    with open(sample_filename, "wb") as f:
+                        f.write(audio.get_wav_data())
+                    samples.append(sample_filename)
+        finally:
+            self.recording_samples.clear()
 
         return samples
 
@@ -260,12 +335,12 @@ class VoiceAssistant(QObject):
         try:
             samples = self.record_voice_samples()
             # Criar a voz clonada passando os nomes dos arquivos diretamente
-            self.cloned_voice = self.eleven.clone(
-                name="Cloned_User_Voice",
+            cloned_voice = self.eleven.clone(
+                name=self.synthesizer.CLONED_VOICE,
                 files=samples,  # Passa os nomes dos arquivos diretamente
                 description="Voz clonada do usuário"
             )
-            self.using_cloned_voice = True
+            self.synthesizer.set_cloned_voice(cloned_voice.voice_id)
 
             # Remover as amostras de áudio
             for sample in samples:
@@ -282,7 +357,9 @@ class VoiceAssistant(QObject):
     def stop_listening(self):
         logging.info("Parando escuta...")
         self.should_listen.clear()
+        self.mic_stream.pause()
 
     def start_listening(self):
         logging.info("Iniciando escuta...")
+        self.mic_stream.resume()
         self.should_listen.set()
\ No newline at end of file
@@ -0,0 +1,124 @@
+# voice_registry.py
+import os
+import json
+import time
+import threading
+import logging
+import traceback
+import utils
+
+VOICE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(utils.SETTINGS_FILE)), 'voices_cache.json')
+
+
+class VoiceRegistry:
+    """Resolve nomes de voz do ElevenLabs para IDs e mantém o resultado em cache."""
+
+    def __init__(self, client, cache_file=VOICE_CACHE_FILE, ttl=3600):
+        self.client = client
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refreshing = False
+        # nome -> {"voice_id": ..., "updated_at": ...}
+        self.voices = {}
+        self._load()
+
+    def _load(self):
+        """Carrega as vozes salvas para uma inicialização sem chamadas de rede."""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    self.voices = json.load(f)
+                logging.info(f"Cache de vozes carregado ({len(self.voices)} vozes)")
+        except Exception as e:
+            logging.error(f"Erro ao carregar o cache de vozes: {e}")
+            self.voices = {}
+
+    def _save(self):
+        try:
+            with self.lock:
+                data = dict(self.voices)
+            with open(self.cache_file, 'w') as f:
+                json.dump(data, f, indent=4)
+        except Exception as e:
+            logging.error(f"Erro ao salvar o cache de vozes: {e}")
+
+    def _is_stale(self, entry):
+        return time.time() - entry.get("updated_at", 0) > self.ttl
+
+    def refresh(self):
+        """Busca a lista de vozes na API e atualiza o cache."""
+        voices = self.client.voices.get_all()
+        now = time.time()
+        with self.lock:
+            found = {v.name for v in voices.voices}
+            for name, entry in self.voices.items():
+                # Nomes ausentes da conta continuam com a substituta (ou sem voz) por mais um ttl
+                if name not in found and "missing" in entry:
+                    entry["updated_at"] = now
+                    if entry["voice_id"] is not None and voices.voices:
+                        entry["voice_id"] = voices.voices[0].voice_id
+            for v in voices.voices:
+                self.voices[v.name] = {"voice_id": v.voice_id, "updated_at": now}
+        self._save()
+        logging.info(f"Lista de vozes atualizada ({len(voices.voices)} vozes)")
+        return voices.voices
+
+    def refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def worker():
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Erro ao atualizar a lista de vozes: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing = False
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def resolve(self, name, fallback_to_first=True):
+        """Retorna o voice_id de uma voz pelo nome, consultando a API só quando necessário."""
+        with self.lock:
+            entry = self.voices.get(name)
+
+        if entry:
+            # Valor vencido continua valendo enquanto é renovado em segundo plano
+            if self._is_stale(entry):
+                self.refresh_in_background()
+            return entry["voice_id"]
+
+        try:
+            voices = self.refresh()
+        except Exception as e:
+            logging.error(f"Erro ao resolver a voz {name}: {e}")
+            traceback.print_exc()
+            return None
+
+        with self.lock:
+            entry = self.voices.get(name)
+            if entry and "missing" not in entry:
+                return entry["voice_id"]
+            # Guarda a ausência para as próximas falas não consultarem a API de novo
+            voice_id = voices[0].voice_id if fallback_to_first and voices else None
+            self.voices[name] = {"voice_id": voice_id, "updated_at": time.time(), "missing": True}
+        self._save()
+        if voice_id is not None:
+            logging.warning(f"Voz {name} não encontrada, usando {voices[0].name}")
+        return voice_id
+
+    def register(self, name, voice_id):
+        """Registra uma voz criada localmente (ex.: voz clonada)."""
+        with self.lock:
+            self.voices[name] = {"voice_id": voice_id, "updated_at": time.time()}
+        self._save()
+
+    def get(self, name):
+        """Retorna o voice_id salvo sem consultar a API."""
+        with self.lock:
+            entry = self.voices.get(name)
+        return entry["voice_id"] if entry else None